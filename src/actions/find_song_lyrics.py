@@ -6,12 +6,12 @@ from functools import partial
 
 import lyricsgenius
 from spotdl import Spotdl
-from mutagen import File
 from src.utils.logger import get_action_logger
 from src.config import Config
+from src.clients.db_client import get_database
+from src.services.tag_cache import get_tags
 import subprocess
 import tempfile
-import sqlite3
 from datetime import datetime, timedelta
 
 logger = get_action_logger("find_song_lyrics")
@@ -20,40 +20,15 @@ INITIAL_BACKOFF = 2  # 2 seconds
 MAX_BACKOFF = 7200  # 2 hours
 current_backoff = INITIAL_BACKOFF
 
-global_conn = None
-db_lock = multiprocessing.Lock()
-
-def get_db_connection(config_root="/app/config/"):
-    conn = sqlite3.connect(config_root + Config.DATABASE_FILE_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def create_table(config_root="/app/config/"):
-    conn = get_db_connection(config_root)
-    cursor = conn.cursor()
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS lyrics_tracking (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        artist TEXT,
-        album TEXT,
-        filename TEXT,
-        lyrics_found BOOLEAN,
-        last_check_date DATE,
-        UNIQUE(artist, album, filename)
-    )
-    ''')
-
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_artist_album_filename ON lyrics_tracking(artist, album, filename)')
-    conn.commit()
-
-def get_metadata(file_path):
+
+def get_db(config_root="/app/config/"):
+    return get_database(config_root + Config.DATABASE_FILE_NAME)
+
+def get_metadata(file_path, config_root="/app/config/"):
     try:
-        audio = File(file_path, easy=True)
-        if audio is not None:
-            title = audio.get('title', [''])[0]
-            artist = audio.get('artist', [''])[0]
-            album = audio.get('album', [''])[0]
-            return title, artist, album
+        tags = get_tags(file_path, config_root + Config.DATABASE_FILE_NAME)
+        if tags is not None:
+            return tags.title or '', tags.artist or '', tags.album or ''
     except Exception as e:
         logger.error(f"Error reading metadata for {file_path}: {str(e)}")
     return None, None, None
@@ -137,67 +112,58 @@ def get_lyrics_from_spotdl(title, artist):
 
 
 def find_and_save_lyrics(file_path, config_root):
-    conn = get_db_connection(config_root)
-    try:
-        cursor = conn.cursor()
-
-        title, artist, album = get_metadata(file_path)
-
-        filename = os.path.basename(file_path)
-
-        # Check if we've searched for this song recently
-        cursor.execute('''
-        SELECT * FROM lyrics_tracking 
-        WHERE artist = ? AND album = ? AND filename = ?
-        ''', (artist, album, filename))
-
-        record = cursor.fetchone()
-
-        current_date = datetime.now().date()
-
-        if record:
-            if record['lyrics_found']:
-                logger.info(f"Lyrics already found for {filename}. Skipping.")
-                # conn.close()
+    db = get_db(config_root)
+    title, artist, album = get_metadata(file_path, config_root)
+
+    filename = os.path.basename(file_path)
+
+    # Check if we've searched for this song recently
+    record = db.fetch_one('''
+    SELECT lyrics_found, last_check_date FROM lyrics_tracking
+    WHERE artist = ? AND album = ? AND filename = ?
+    ''', (artist, album, filename))
+
+    current_date = datetime.now().date()
+
+    if record:
+        if record[0]:
+            logger.info(f"Lyrics already found for {filename}. Skipping.")
+            return
+        elif record[1]:
+            last_check_date = datetime.strptime(record[1], '%Y-%m-%d').date()
+            if (current_date - last_check_date).days < 7:
+                logger.info(f"Lyrics check for {filename} was performed recently. Skipping.")
                 return
-            elif record['last_check_date']:
-                last_check_date = datetime.strptime(record['last_check_date'], '%Y-%m-%d').date()
-                if (current_date - last_check_date).days < 7:
-                    logger.info(f"Lyrics check for {filename} was performed recently. Skipping.")
-                    return
-
-        lrc_file = os.path.splitext(file_path)[0] + '.lrc'
-        lyrics_found = False
-
-        if os.path.exists(lrc_file):
-            logger.debug(f"Lyrics file already exists for {filename}. Skipping.")
-            lyrics_found = True
-        else:
-            if title and artist:
-                logger.info(f"Searching for lyrics on Genius for {title} by {artist}")
-                lyrics = get_lyrics_from_genius(title, artist)
-                if not lyrics:
-                    logger.info(f"Searching for lyrics on Spotdl for {title} by {artist}")
-                    lyrics = get_lyrics_from_spotdl(title, artist)
-
-                if lyrics:
-                    logger.info(f"Found lyrics for {title} by {artist}")
-                    save_lyrics(lyrics, file_path)
-                    lyrics_found = True
-                else:
-                    logger.warning(f"No lyrics found for {title} by {artist}")
+
+    lrc_file = os.path.splitext(file_path)[0] + '.lrc'
+    lyrics_found = False
+
+    if os.path.exists(lrc_file):
+        logger.debug(f"Lyrics file already exists for {filename}. Skipping.")
+        lyrics_found = True
+    else:
+        if title and artist:
+            logger.info(f"Searching for lyrics on Genius for {title} by {artist}")
+            lyrics = get_lyrics_from_genius(title, artist)
+            if not lyrics:
+                logger.info(f"Searching for lyrics on Spotdl for {title} by {artist}")
+                lyrics = get_lyrics_from_spotdl(title, artist)
+
+            if lyrics:
+                logger.info(f"Found lyrics for {title} by {artist}")
+                save_lyrics(lyrics, file_path)
+                lyrics_found = True
             else:
-                logger.warning(f"Couldn't extract metadata from {file_path}")
-
-        # Update or insert record in database
-        cursor.execute('''
-        INSERT OR REPLACE INTO lyrics_tracking 
-        (artist, album, filename, lyrics_found, last_check_date)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (artist, album, filename, lyrics_found, current_date))
-        conn.commit()
-    finally:
-        conn.close()
+                logger.warning(f"No lyrics found for {title} by {artist}")
+        else:
+            logger.warning(f"Couldn't extract metadata from {file_path}")
+
+    # Update or insert record in database
+    db.execute_query('''
+    INSERT OR REPLACE INTO lyrics_tracking 
+    (artist, album, filename, lyrics_found, last_check_date)
+    VALUES (?, ?, ?, ?, ?)
+    ''', (artist, album, filename, lyrics_found, current_date))
 #
 # def process_music_folder(folder_path):
 #     logger.info(f"Processing music folder: {folder_path}")
@@ -236,7 +202,8 @@ def process_file(file_path, config_root):
 
 
 def process_music_folder(folder_path, config_root="/app/config/"):
-    create_table(config_root)
+    # Migrate the schema once before the workers fork
+    get_db(config_root)
 
     file_paths = []
     for entry in os.scandir(folder_path):
@@ -1,12 +1,11 @@
 # import shlex
-import json
-import sqlite3
-import time
-import subprocess
-import unicodedata
+import asyncio
+import sys
 from src.utils.logger import get_action_logger
 from src.config import Config
-import re
+from src.services.download_queue import DownloadQueue
+from src.services.spotdl_engine import InProcessSpotdlEngine
+from src.utils import title_normalizer
 
 logger = get_action_logger("find_unmatched_songs_with_spotdl")
 
@@ -17,111 +16,146 @@ def remove_special_characters(string, skip_non_ascii=False):
     if string is None:
         return ""
 
-    # Normalize Unicode characters
-    normalized = unicodedata.normalize('NFKD', string)
-
-    # Remove diacritics (accent marks)
-    without_diacritics = ''.join([c for c in normalized if not unicodedata.combining(c)])
-
-    # Replace spaces and other special characters with underscores
-    cleaned_string = re.sub(r'[^\w\s-]', '_', without_diacritics)
-
-    # Replace multiple consecutive underscores with a single underscore
-    cleaned_string = re.sub(r'_+', '_', cleaned_string)
-
-    # Remove leading and trailing underscores
-    cleaned_string = cleaned_string.strip('_')
-
-    # Remove non-ASCII characters
-    cleaned_string = cleaned_string.encode('ascii', 'ignore').decode('ascii')
-
-    if cleaned_string == '':
-        return None
-
-    return cleaned_string
-
-
-async def find_unmatched_songs(output_dir, config_root="/app/config/"):
-    # Connect to the SQLite database
-    conn = sqlite3.connect(config_root + Config.DATABASE_FILE_NAME)
-    c = conn.cursor()
-    # Create the table to store downloaded songs if it doesn't exist
-    c.execute('''CREATE TABLE IF NOT EXISTS downloaded_songs
-                (track_name TEXT, artist_name TEXT, album_name TEXT)''')
-
-    # Remove duplicates from the unmatched songs table
-    c.execute('''DELETE FROM unmatched_songs
-                WHERE rowid NOT IN (
-                    SELECT MIN(rowid)
-                    FROM unmatched_songs
-                    GROUP BY track_name, artist_name, album_name
-                )''')
-    conn.commit()
-
-    # Retrieve the unmatched songs from the database
-    c.execute('SELECT DISTINCT track_name, artist_name, album_name FROM unmatched_songs')
-    unmatched_songs = c.fetchall()
-
-    # Get the total number of unmatched songs
-    total_unmatched_songs = len(unmatched_songs)
-
-    # Process each unmatched song
-    for index, song in enumerate(unmatched_songs, start=1):
-        track_name, artist_name, album_name = song
-
-        cleaned_track = remove_special_characters(track_name)
-        cleaned_artist = remove_special_characters(artist_name)
-
-        # Check if the song has already been downloaded
-        c.execute('SELECT COUNT(*) FROM downloaded_songs WHERE track_name = ? AND artist_name = ? AND album_name = ?',
-                  (track_name, artist_name, album_name))
-        count = c.fetchone()[0]
-
-        if count > 0:
-            logger.info(f"Skipping '{track_name}' by {artist_name} - already downloaded")
-            continue
-
-        logger.info(f"Processing unmatched song: '{track_name}' by {artist_name}")
-
-        # Use spotdl to find and download the song
-        spotdl_path = "python -m spotdl"
-        try:
-            command = f'{spotdl_path} download "{cleaned_artist} - {cleaned_track}" --output "{output_dir}"'
-            logger.info(f"Running command: {command}")
-
-
-            result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-
-            logger.info(f"spotdl output: {result}")
-
-            # time.sleep(5)
-
-            if result.returncode == 0:
-                logger.info(f"Successfully downloaded '{track_name}' by {artist_name}")
-
-                # Insert the downloaded song into the database
-                c.execute('INSERT INTO downloaded_songs VALUES (?, ?, ?)', (track_name, artist_name, album_name))
-                conn.commit()
-            else:
-                logger.error(f"Error downloading '{track_name}' by {artist_name}")
+    return title_normalizer.to_ascii_name(string)
+
+
+def build_query(song):
+    track_name, artist_name, album_name = song
+    return f"{remove_special_characters(artist_name)} - {remove_special_characters(track_name)}"
+
+
+async def run_spotdl(query, output_dir, timeout=Config.MUSIC_SPOTDL_TIMEOUT):
+    """
+    Download one song with spotdl in a child process. Returns (returncode, output),
+    with returncode None if the download was killed for running past the timeout.
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-m', 'spotdl', 'download', query, '--output', output_dir,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+    try:
+        output, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return None, f"Timed out after {timeout} seconds"
+    return process.returncode, output.decode(errors='replace')
+
+
+async def download_songs(songs, output_dir, on_downloaded, concurrency=Config.MUSIC_SPOTDL_CONCURRENCY,
+                         timeout=Config.MUSIC_SPOTDL_TIMEOUT, on_failed=None):
+    """
+    Drain (track_name, artist_name, album_name) songs through a pool of spotdl workers.
+    on_downloaded(song) is called for every successful download, on_failed(song, error) for every failure.
+    Returns the number downloaded.
+    """
+    queue = asyncio.Queue()
+    for song in songs:
+        queue.put_nowait(song)
+
+    total = queue.qsize()
+    finished = 0
+    downloaded = 0
+
+    async def worker():
+        nonlocal finished, downloaded
+        while True:
+            try:
+                song = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            track_name, artist_name, album_name = song
+            query = build_query(song)
+            logger.info(f"Running spotdl for: {query}")
+
+            try:
+                returncode, output = await run_spotdl(query, output_dir, timeout)
+                logger.debug(f"spotdl output: {output}")
+                if returncode == 0:
+                    logger.info(f"Successfully downloaded '{track_name}' by {artist_name}")
+                    on_downloaded(song)
+                    downloaded += 1
+                else:
+                    logger.error(f"Error downloading '{track_name}' by {artist_name}")
+                    logger.error(f"Error message: {output[-500:]}")
+                    if on_failed:
+                        on_failed(song, output[-500:])
+            except Exception as e:
+                logger.error(f"Unexpected error downloading '{track_name}' by {artist_name}")
                 logger.error(f"Error message: {str(e)}")
-
-            logger.info(f"Successfully downloaded '{track_name}' by {artist_name}")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error downloading '{track_name}' by {artist_name}")
-            logger.error(f"Error message: {str(e)}")
-        except json.JSONDecodeError:
-            logger.error(f"Error parsing spotdl output for '{track_name}' by {artist_name}")
-        except Exception as e:
-            logger.error(f"Unexpected error downloading '{track_name}' by {artist_name}")
-            logger.error(f"Error message: {str(e)}")
-
-        # Calculate the percentage of songs processed
-        percentage = (index / total_unmatched_songs) * 100
-        logger.info(f"Progress: {index}/{total_unmatched_songs} ({percentage:.2f}%)")
+                if on_failed:
+                    on_failed(song, str(e))
+
+            finished += 1
+            percentage = (finished / total) * 100
+            logger.info(f"Progress: {finished}/{total} ({percentage:.2f}%)")
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    return downloaded
+
+
+async def download_songs_in_process(songs, output_dir, on_downloaded, concurrency=Config.MUSIC_SPOTDL_CONCURRENCY,
+                                    on_failed=None):
+    """
+    Same contract as download_songs, but submits the songs in batches to one in-process Spotdl instance.
+    """
+    songs_by_query = {}
+    for song in songs:
+        songs_by_query.setdefault(build_query(song), []).append(song)
+
+    total = len(songs_by_query)
+    finished = 0
+    downloaded = 0
+
+    def on_batch_done(outcomes):
+        nonlocal finished, downloaded
+        for query, success in outcomes.items():
+            for song in songs_by_query[query]:
+                if success:
+                    logger.info(f"Successfully downloaded '{song[0]}' by {song[1]}")
+                    on_downloaded(song)
+                    downloaded += 1
+                else:
+                    logger.error(f"Error downloading '{song[0]}' by {song[1]}")
+                    if on_failed:
+                        on_failed(song, "spotdl could not find or download the song")
+        finished += len(outcomes)
+        percentage = (finished / total) * 100
+        logger.info(f"Progress: {finished}/{total} ({percentage:.2f}%)")
+
+    engine = InProcessSpotdlEngine(output_dir, threads=concurrency)
+    await engine.download(songs_by_query.keys(), on_batch_done)
+    return downloaded
+
+
+async def find_unmatched_songs(output_dir, config_root="/app/config/", concurrency=Config.MUSIC_SPOTDL_CONCURRENCY,
+                               engine=Config.MUSIC_SPOTDL_ENGINE, batch_size=100):
+    download_queue = DownloadQueue(config_root + Config.DATABASE_FILE_NAME)
+    requeued = download_queue.requeue_stale()
+    if requeued:
+        logger.info(f"Requeued {requeued} downloads left in progress by an earlier run")
+    logger.info(f"Download queue: {download_queue.counts()}, using the {engine} spotdl engine")
+
+    attempted = 0
+    downloaded = 0
+    # Claim due jobs a batch at a time; failed ones are pushed back to a later run
+    while True:
+        songs = download_queue.claim(batch_size)
+        if not songs:
+            break
+
+        attempted += len(songs)
+        if engine == "in_process":
+            downloaded += await download_songs_in_process(songs, output_dir, download_queue.mark_done, concurrency,
+                                                          on_failed=download_queue.mark_failed)
+        else:
+            downloaded += await download_songs(songs, output_dir, download_queue.mark_done, concurrency,
+                                               on_failed=download_queue.mark_failed)
+
+    logger.info(f"Downloaded {downloaded}/{attempted} queued songs")
 
     # Close the database connection
-    conn.close()
+    download_queue.close()
 
 
 if __name__ == '__main__':
@@ -130,4 +164,4 @@ if __name__ == '__main__':
 
     # # Set the output directory where the songs will be saved
     output_dir = "C:\\Music\\spotdl_downloads"
-    find_unmatched_songs(output_dir)
+    asyncio.run(find_unmatched_songs(output_dir))
@@ -16,6 +16,7 @@ import signal
 from functools import wraps
 
 from mutagen.flac import FLAC
+from src.services.tag_cache import TagCache
 from src.utils.logger import get_action_logger
 from dotenv import load_dotenv
 
@@ -123,7 +124,7 @@ def identify_track(file_path):
                 musicbrainz_id = result['recordings'][0]['id']
                 logger.info(f"Fetching MusicBrainz data for: {file_path}")
                 mb_result = rate_limited_request(musicbrainzngs.get_recording_by_id, musicbrainz_id,
-                                                 includes=['artists', 'releases'])
+                                                 includes=['artists', 'releases', 'isrcs'])
                 logger.info(f"MusicBrainz data fetched for: {file_path}")
                 logger.debug(f"MusicBrainz result: {mb_result}")
 
@@ -155,7 +156,9 @@ def identify_track(file_path):
                             'release-list') and 'date' in mb_result['recording']['release-list'][0] else None,
                         'release_id': mb_result['recording'].get('release-list', [{}])[0].get('id') if mb_result[
                             'recording'].get('release-list') else None,
-                        'track_number': track_number
+                        'track_number': track_number,
+                        'recording_id': mb_result['recording']['id'],
+                        'isrc': next(iter(mb_result['recording'].get('isrc-list', [])), None)
                     }
                 else:
                     logger.warning(f"Unexpected MusicBrainz result structure for: {file_path}")
@@ -206,6 +209,11 @@ def update_metadata(file_path, metadata):
                 audio['year'] = metadata['year']
         if metadata.get('track_number'):
             audio['tracknumber'] = metadata['track_number']
+        # Recording id and ISRC end up in Emby's ProviderIds, where the playlist sync matches on them
+        if metadata.get('recording_id'):
+            audio['musicbrainz_trackid'] = metadata['recording_id']
+        if metadata.get('isrc'):
+            audio['isrc'] = metadata['isrc']
 
         if metadata.get('release_id'):
             album_art = fetch_album_art(metadata['release_id'])
@@ -231,6 +239,8 @@ def update_metadata(file_path, metadata):
 
 
 async def match_metadata_unorg_music_folder(downloads_folder):
+    # Files whose tags are complete and unchanged are skipped without being reopened
+    tag_cache = TagCache()
     for root, _, files in os.walk(downloads_folder):
         for file in files:
             if file.lower().endswith(('.mp3', '.flac', '.m4a', '.wav')):
@@ -243,21 +253,15 @@ async def match_metadata_unorg_music_folder(downloads_folder):
                         logger.warning(f"File not found: {file_path}")
                         continue
 
-                    try:
-                        if file.lower().endswith('.mp3'):
-                            audio = EasyID3(file_path)
-                        elif file.lower().endswith('.flac'):
-                            audio = FLAC(file_path)
-                        else:
-                            audio = File(file_path, easy=True)
-                    except Exception as e:
-                        logger.error(f"Error reading audio file {file_path}: {str(e)}")
+                    tags = tag_cache.get(file_path)
+                    if tags is None:
+                        logger.error(f"Error reading audio file {file_path}")
                         # delete file
                         # os.remove(file_path)
                         # logger.info(f"Deleted unreadable file: {file_path}")
                         continue
 
-                    if not all(tag in audio for tag in ['title', 'artist', 'album']):
+                    if not all([tags.title, tags.artist, tags.album]):
                         logger.info(f"Missing metadata for file: {file_path}")
                         metadata = identify_track(file_path)
                         if metadata:
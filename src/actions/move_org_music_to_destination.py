@@ -1,12 +1,11 @@
 import os
 import shutil
-import mutagen
 import requests
-from mutagen import File
-from mutagen.flac import FLAC
-from mutagen.easyid3 import EasyID3
 from fuzzywuzzy import fuzz
+from src.clients.lidarr_client import LidarrClient
 from src.config import Config
+from src.services.tag_cache import forget_tags, get_tags, prefetch_metadata
+from src.utils.file_utils import FileUtils
 from src.utils.logger import get_action_logger
 logger = get_action_logger("move_organized_music")
 
@@ -31,69 +30,12 @@ def is_similar_artist(new_artist, existing_artist, threshold=90):
     return fuzz.ratio(new_artist.lower(), existing_artist.lower()) >= threshold
 
 
-def get_artist_from_lidarr(artist_name):
-    lidarr_url = Config.LIDARR_URL
-    lidarr_api_key = Config.LIDARR_API_KEY
-
-    search_url = f"{lidarr_url}/api/v1/artist/lookup"
-    params = {"term": artist_name}
-    headers = {"X-Api-Key": lidarr_api_key}
-
-    try:
-        response = requests.get(search_url, params=params, headers=headers)
-        response.raise_for_status()
-        search_results = response.json()
-
-        if search_results:
-            matched_artist = next(
-                (artist for artist in search_results if is_similar_artist(artist_name, artist['artistName'])),
-                None
-            )
-            if matched_artist:
-                # Check if the artist is already monitored in Lidarr
-                get_artist_url = f"{lidarr_url}/api/v1/artist"
-                get_artist_response = requests.get(get_artist_url, headers=headers)
-                get_artist_response.raise_for_status()
-                existing_artists = get_artist_response.json()
-
-                existing_artist = next((artist for artist in existing_artists if
-                                        artist['foreignArtistId'] == matched_artist['foreignArtistId']), None)
-
-                if existing_artist:
-                    return existing_artist
-                else:
-                    # Add the artist to Lidarr
-                    add_url = f"{lidarr_url}/api/v1/artist"
-                    add_data = {
-                        "artistName": matched_artist['artistName'],
-                        "foreignArtistId": matched_artist['foreignArtistId'],
-                        "qualityProfileId": Config.LIDARR_QUALITY_PROFILE_ID,
-                        "metadataProfileId": Config.LIDARR_METADATA_PROFILE_ID,
-                        "monitored": True,
-                        "monitorNewItems": Config.LIDARR_MONITOR_NEW_ITEMS,
-                        "rootFolderPath": Config.MUSIC_STORAGE_DIR,
-                        "addOptions": {
-                            "monitor": Config.LIDARR_MONITOR_OPTION,
-                            "searchForMissingAlbums": Config.LIDARR_SEARCH_FOR_MISSING_ALBUMS
-                        },
-                        "artistType": matched_artist.get('artistType', ''),
-                        "path": os.path.join(Config.MUSIC_STORAGE_DIR, matched_artist['artistName']),
-                        "mbId": matched_artist.get('mbId'),
-                        "tags": [],
-                        "genres": matched_artist.get('genres', []),
-                        "status": matched_artist.get('status', 'continuing')
-                    }
-                    add_response = requests.post(add_url, json=add_data, headers=headers)
-                    add_response.raise_for_status()
-                    return add_response.json()
-
-    except requests.RequestException as e:
-        logger.error(f"Error communicating with Lidarr API: {str(e)}")
+def get_artist_from_lidarr(lidarr, artist_name):
+    # Looks the artist up in the cached Lidarr catalog, adding it to Lidarr if it isn't there yet
+    return lidarr.get_artist(artist_name, add_if_not_matched=True)
 
-    return None
 
-
-def refresh_artist_in_lidarr(artist_name):
+def refresh_artist_in_lidarr(lidarr, artist_name):
     lidarr_url = Config.LIDARR_URL
     lidarr_api_key = Config.LIDARR_API_KEY
 
@@ -126,13 +68,7 @@ def refresh_artist_in_lidarr(artist_name):
                     return
 
             # Check if the artist is already monitored in Lidarr
-            get_artist_url = f"{lidarr_url}/api/v1/artist"
-            get_artist_response = requests.get(get_artist_url, headers=headers)
-            get_artist_response.raise_for_status()
-            existing_artists = get_artist_response.json()
-
-            existing_artist = next((artist for artist in existing_artists if
-                                    artist['foreignArtistId'] == matched_artist['foreignArtistId']), None)
+            existing_artist = lidarr.get_existing_artist(matched_artist['foreignArtistId'])
 
             if existing_artist:
                 artist_id = existing_artist['id']
@@ -162,6 +98,7 @@ def refresh_artist_in_lidarr(artist_name):
                 }
                 add_response = requests.post(add_url, json=add_data, headers=headers)
                 add_response.raise_for_status()
+                lidarr.catalog.invalidate()
                 artist_id = add_response.json()['id']
                 logger.info(f"Artist '{artist_name}' added to Lidarr with ID: {artist_id}")
 
@@ -185,25 +122,13 @@ def refresh_artist_in_lidarr(artist_name):
 
 def get_file_metadata(file_path):
     try:
-        file_extension = os.path.splitext(file_path)[1].lower()
-
-        if file_extension == '.mp3':
-            try:
-                audio = EasyID3(file_path)
-            except mutagen.id3.ID3NoHeaderError:
-                audio = File(file_path, easy=True)
-                if audio is None:
-                    return None, None
-        elif file_extension == '.flac':
-            audio = FLAC(file_path)
-        else:
-            audio = File(file_path, easy=True)
-            if audio is None:
-                logger.warning(f"Unsupported file format for {file_path}")
-                return None, None
+        tags = get_tags(file_path)
+        if tags is None:
+            logger.warning(f"Unsupported file format for {file_path}")
+            return None, None
 
-        title = audio.get('title', [''])[0]
-        track = audio.get('tracknumber', [''])[0].split('/')[0]  # Get the track number before the total tracks
+        title = tags.title or ''
+        track = (tags.track_number or '').split('/')[0]  # Get the track number before the total tracks
         return title.lower(), track
     except Exception as e:
         logger.error(f"Error reading metadata for {file_path}: {str(e)}")
@@ -211,22 +136,28 @@ def get_file_metadata(file_path):
 
 
 def merge_albums(source_album_path, destination_album_path, dry_run=False):
-    # Get metadata for all files in the destination album
+    # Get metadata for all files in both albums up front, reading the tags concurrently
+    dest_files = [file for file in os.listdir(destination_album_path)
+                  if os.path.isfile(os.path.join(destination_album_path, file))]
+    source_files = [file for file in os.listdir(source_album_path)
+                    if os.path.isfile(os.path.join(source_album_path, file))]
+    metadata = prefetch_metadata([os.path.join(destination_album_path, file) for file in dest_files] +
+                                 [os.path.join(source_album_path, file) for file in source_files],
+                                 get_file_metadata)
+
     dest_files_metadata = {}
-    for file in os.listdir(destination_album_path):
-        file_path = os.path.join(destination_album_path, file)
-        if os.path.isfile(file_path):
-            title, track = get_file_metadata(file_path)
-            if title and track:
-                dest_files_metadata[(title, track)] = file
-
-    for file in os.listdir(source_album_path):
+    for file in dest_files:
+        title, track = metadata[os.path.join(destination_album_path, file)]
+        if title and track:
+            dest_files_metadata[(title, track)] = file
+
+    for file in source_files:
         logger.debug(f"Processing file '{file}'")
         source_file_path = os.path.join(source_album_path, file)
         destination_file_path = os.path.join(destination_album_path, file)
 
         if os.path.isfile(source_file_path):
-            title, track = get_file_metadata(source_file_path)
+            title, track = metadata[source_file_path]
 
             if title is None and track is None:
                 logger.warning(f"Could not read metadata for '{file}'. Skipping.")
@@ -239,6 +170,7 @@ def merge_albums(source_album_path, destination_album_path, dry_run=False):
                 # delete file since it already exists
                 try:
                     os.remove(source_file_path)
+                    forget_tags(source_file_path)
                     logger.warning(f"Deleted file '{source_file_path}' since it already exists at destination path '{destination_file_path}'.")
                 except OSError:
                     logger.warning(f"Failed to delete file '{source_file_path}'.")
@@ -249,6 +181,7 @@ def merge_albums(source_album_path, destination_album_path, dry_run=False):
                     logger.info(f"[DRY RUN] Would move file '{file}' to '{destination_album_path}'")
                 else:
                     shutil.move(source_file_path, destination_file_path)
+                    forget_tags(source_file_path)
                     logger.info(f"Moved file '{file}' to '{destination_album_path}'")
             else:
                 # File with same name exists, but metadata is different
@@ -261,44 +194,16 @@ def merge_albums(source_album_path, destination_album_path, dry_run=False):
                     logger.info(f"[DRY RUN] Would move file '{file}' to '{new_destination_path}'")
                 else:
                     shutil.move(source_file_path, new_destination_path)
+                    forget_tags(source_file_path)
                     logger.info(f"Moved file '{file}' to '{new_destination_path}'")
 
     # Check for and remove empty subdirectories in the source album
-    for root, dirs, files in os.walk(source_album_path, topdown=False):
-        for dir in dirs:
-            dir_path = os.path.join(root, dir)
-            if not os.listdir(dir_path):
-                if dry_run:
-                    logger.info(f"[DRY RUN] Would remove empty directory: '{dir_path}'")
-                else:
-                    os.rmdir(dir_path)
-                    logger.info(f"Removed empty directory: '{dir_path}'")
+    FileUtils.remove_empty_dirs(logger, source_album_path, dry_run)
 
 
 def remove_empty_folders(path, dry_run=False):
-    for root, dirs, files in os.walk(path, topdown=False):
-        for dir in dirs:
-            dir_path = os.path.join(root, dir)
-            if not os.listdir(dir_path):  # Check if the directory is empty
-                if dry_run:
-                    logger.info(f"[DRY RUN] Would remove empty directory: '{dir_path}'")
-                else:
-                    try:
-                        os.rmdir(dir_path)
-                        logger.info(f"Removed empty directory: '{dir_path}'")
-                    except OSError as e:
-                        logger.error(f"Error removing directory '{dir_path}': {e}")
-
-    # Check if the root folder is empty and remove it if so
-    if not os.listdir(path):
-        if dry_run:
-            logger.info(f"[DRY RUN] Would remove empty root directory: '{path}'")
-        else:
-            try:
-                os.rmdir(path)
-                logger.info(f"Removed empty root directory: '{path}'")
-            except OSError as e:
-                logger.error(f"Error removing root directory '{path}': {e}")
+    # Empty subfolders and then the root folder itself, in a single pass
+    FileUtils.remove_empty_dirs(logger, path, dry_run, include_top=True)
 
 
 # async def move_organized_music(source_folder, destination_folder, dry_run=False):
@@ -359,13 +264,14 @@ def remove_empty_folders(path, dry_run=False):
 #     #         os.rmdir(source_artist_path)
 #     #         logger.info(f"Removed empty artist folder: '{artist_folder}'")
 async def move_organized_music(source_folder, destination_folder, dry_run=False):
+    lidarr = LidarrClient()
     for artist_folder in os.listdir(source_folder):
         source_artist_path = os.path.join(source_folder, artist_folder)
         if os.path.isdir(source_artist_path):
             clean_artist_name = clean_name(artist_folder)
 
             # Check if the artist exists in Lidarr
-            lidarr_artist = get_artist_from_lidarr(clean_artist_name)
+            lidarr_artist = get_artist_from_lidarr(lidarr, clean_artist_name)
 
             if lidarr_artist:
                 destination_artist_path = lidarr_artist['path']
@@ -390,12 +296,13 @@ async def move_organized_music(source_folder, destination_folder, dry_run=False)
                         else:
                             try:
                                 shutil.move(source_album_path, destination_album_path)
+                                forget_tags(source_album_path)
                                 logger.info(f"Moved album '{clean_album_name}' to '{clean_artist_name}'")
                             except Exception as e:
                                 logger.error(f"Error moving album '{clean_album_name}' to '{clean_artist_name}': {e}")
 
             if not dry_run:
-                refresh_artist_in_lidarr(clean_artist_name)
+                refresh_artist_in_lidarr(lidarr, clean_artist_name)
 
     # Remove empty folders in the source directory
     remove_empty_folders(source_folder, dry_run)
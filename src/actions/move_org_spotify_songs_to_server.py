@@ -7,13 +7,14 @@ from src.utils.logger import get_action_logger
 import sys
 import filecmp
 
+from src.utils.file_utils import DirectoryWalker, FileUtils
 from src.utils.string_utils import StringUtils
 
 logger = get_action_logger("move_org_spotify_songs_to_server")
 
 
 async def move_org_spotify_music_to_server(source, destination, dry_run=False):
-    for root, dirs, files in os.walk(source):
+    for root, dirs, files in DirectoryWalker(source, logger=logger):
         logger.info(f"Processing directory: {root}")
         # Create relative path
         rel_path = os.path.relpath(root, source)
@@ -23,9 +24,10 @@ async def move_org_spotify_music_to_server(source, destination, dry_run=False):
         if not dry_run:
             os.makedirs(dest_path, exist_ok=True)
 
-        for file in files:
+        for entry in files:
+            file = entry.name
             logger.info(f"Processing file: {file}")
-            src_file = os.path.join(root, file)
+            src_file = entry.path
             dest_file = os.path.join(dest_path, StringUtils.remove_special_characters(file))
 
             if dry_run:
@@ -69,11 +71,6 @@ if __name__ == "__main__":
 
     # Clean up empty directories in the source
     if not dry_run:
-        for root, dirs, files in os.walk(SOURCE_DIR, topdown=False):
-            for dir in dirs:
-                dir_path = os.path.join(root, dir)
-                if not os.listdir(dir_path):
-                    os.rmdir(dir_path)
-                    logger.info(f"Removed empty directory: {dir_path}")
+        FileUtils.remove_empty_dirs(logger, SOURCE_DIR)
     else:
         logger.info("Dry run mode, not removing empty directories.")
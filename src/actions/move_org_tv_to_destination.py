@@ -1,20 +1,30 @@
 import os
+import re
 from rapidfuzz import fuzz, process
 from src.clients.sonarr_client import SonarrClient
 from src.utils.file_utils import FileUtils
 from src.utils.logger import get_action_logger
-from itertools import product
 from src.config import Config
 from src.utils.string_utils import StringUtils
 
 logger = get_action_logger("move_org_tv_shows")
 
+EPISODE_KEY_PATTERN = re.compile(r'S\d{2}E\d{2}')
+
 def adjust_path_for_network(path):
     """Adjust the Sonarr path to the network path."""
     network_path = path.replace('/raid/tv', Config.TV_STORAGE_DIR)
     return network_path  #.replace('/', '\\')
 
 
+def get_episode_keys(directory):
+    """Collect the SxxEyy keys found in the names in a directory, from a single listing."""
+    keys = set()
+    for name in os.listdir(directory):
+        keys.update(EPISODE_KEY_PATTERN.findall(name.upper()))
+    return keys
+
+
 def move_folders(source, destination, dry_run=False):
     """Move season folders from source to destination, checking for existing episodes."""
     for item in os.listdir(source):
@@ -25,6 +35,10 @@ def move_folders(source, destination, dry_run=False):
         if os.path.isdir(s):
             if not os.path.exists(d):
                 os.makedirs(d)
+                existing_episodes = set()
+            else:
+                # Episodes already in the destination season, kept up to date as files are moved in
+                existing_episodes = get_episode_keys(d)
 
             for file in os.listdir(s):
                 source_file = os.path.join(s, file)
@@ -35,9 +49,7 @@ def move_folders(source, destination, dry_run=False):
 
                     if season and episode:
                         # Check if an episode with the same S**E** exists in the destination
-                        existing_files = [f for f in os.listdir(d) if f'S{season}E{episode}' in f.upper()]
-
-                        if existing_files:
+                        if f'S{season}E{episode}' in existing_episodes:
                             logger.info(
                                 f"Episode S{season}E{episode} already exists in destination. Deleting source file.")
                             if not dry_run:
@@ -46,12 +58,14 @@ def move_folders(source, destination, dry_run=False):
                             logger.info(f"Moving {file} to {dest_file}")
                             if not dry_run:
                                 FileUtils.safe_move(logger, source_file, dest_file)
+                                existing_episodes.update(EPISODE_KEY_PATTERN.findall(file.upper()))
                     else:
                         logger.warning(f"Could not extract episode info from {file}. Moving anyway.")
                         if not dry_run:
                             FileUtils.safe_move(logger, source_file, dest_file)
                 elif os.path.isdir(source_file):
                     move_folders(source_file, dest_file)
+                    existing_episodes.update(EPISODE_KEY_PATTERN.findall(file.upper()))
 
             # Remove empty source directory
             if not os.listdir(s):
@@ -62,92 +76,69 @@ def move_folders(source, destination, dry_run=False):
             logger.warning(f"{s} is not a directory. Skipping.")
 
 
-def fuzzy_match(show_name, all_titles):
+def build_title_index(all_titles):
+    """
+    Precompute the comparison keys of all Sonarr titles (main and alternative), once per run.
+    Returns (keys, shows, title_years) with shows[i] the show keys[i] belongs to and title_years[i]
+    the year suffix of that title, if any (remakes like "Doctor Who (1963)" share a key with the original).
+    """
+    keys = [StringUtils.normalize_show_name(title) for title in all_titles]
+    title_years = [StringUtils.extract_year(title) for title in all_titles]
+    return keys, list(all_titles.values()), title_years
+
+
+def fuzzy_match(show_name, all_titles, title_index=None):
     """
     Find the best fuzzy match for a show name from all possible titles.
     """
     logger.info(f"Attempting to find a fuzzy match for: '{show_name}'")
 
+    keys, shows, title_years = title_index or build_title_index(all_titles)
     original_year = StringUtils.extract_year(show_name)
-    name_without_year = ' '.join([word for word in show_name.split() if not word.isdigit() or len(word) != 4])
-
-    variations = [show_name, name_without_year]
-    variations.extend(generate_name_variations(show_name))
-    variations.extend(generate_name_variations(name_without_year))
-    variations = list(set(variations))  # Remove duplicates
-
-    logger.debug(f"Generated {len(variations)} variations of the show name")
-    for i, var in enumerate(variations):
-        logger.debug(f"Variation {i + 1}: '{var}'")
+    show_key = StringUtils.normalize_show_name(show_name)
+    logger.debug(f"Comparing '{show_key}' against {len(keys)} titles")
 
-    best_match = None
-    best_score = 0
+    def preference(match):
+        # Among equal scores: the show from the folder's year, else the title without a year suffix
+        _, score, index = match
+        if original_year:
+            return -score, shows[index].get('year') != original_year, index
+        return -score, title_years[index] is not None, index
 
-    for variation in variations:
-        logger.debug(f"Checking variation: '{variation}'")
+    # One pass scores every title; candidates come back best first
+    matches = process.extract(show_key, keys, scorer=fuzz.ratio, limit=None,
+                              score_cutoff=Config.SONARR_MATCH_THRESHOLD)
+    for key, score, index in sorted(matches, key=preference):
+        potential_match = shows[index]
+        show_year = potential_match.get('year')
+        if original_year and show_year and abs(original_year - show_year) > 1:
+            logger.debug(f"Year mismatch for '{key}': folder year {original_year}, show year {show_year}")
+            continue
 
-        match = process.extractOne(variation, all_titles.keys(), scorer=fuzz.ratio)
-
-        if match:
-            logger.debug(f"Best match for '{variation}': '{match[0]}' with score {match[1]}")
-
-            if match[1] > best_score:
-                potential_match = all_titles[match[0]]
-                show_year = potential_match.get('year')
-
-                if original_year and show_year:
-                    if abs(original_year - show_year) <= 1:
-                        best_score = match[1]
-                        best_match = potential_match
-                        logger.debug(f"New best match: '{best_match['title']}' with score {best_score}")
-                    else:
-                        logger.debug(f"Year mismatch: folder year {original_year}, show year {show_year}")
-                else:
-                    best_score = match[1]
-                    best_match = potential_match
-                    logger.debug(f"New best match: '{best_match['title']}' with score {best_score}")
-        else:
-            logger.debug(f"No match found for variation: '{variation}'")
-
-    if best_score >= Config.SONARR_MATCH_THRESHOLD:
-        logger.info(f"Best match found: '{best_match['title']}' with score {best_score}")
-        return best_match
-    else:
-        logger.info(f"No match found above threshold. Best score was {best_score}")
-        return None
-
-
-def generate_name_variations(show_name):
-    words = show_name.lower().split()
-    variations = []
-
-    for i, word in enumerate(words):
-        if word == 'and':
-            variations.append((['and', '&'], i))
-        elif word == '&':
-            variations.append((['&', 'and'], i))
-        else:
-            variations.append(([word], i))
+        logger.info(f"Best match found: '{potential_match['title']}' with score {score}")
+        return potential_match
 
-    all_combinations = product(*[v[0] for v in variations])
-    return [' '.join(combo) for combo in all_combinations]
+    logger.info(f"No match found above threshold for '{show_key}'")
+    return None
 
 
 def move_organized_tv(sonarr, source_folder, dry_run=False):
     all_shows = sonarr.get_all_shows()
+    title_index = build_title_index(all_shows)
     directories = FileUtils.get_directories(source_folder)
 
     for directory in directories:
         logger.info(f'Processing directory: {directory}')
 
-        best_match = fuzzy_match(directory, all_shows)
+        best_match = fuzzy_match(directory, all_shows, title_index)
 
         if best_match:
             show = best_match
             if show.get("id"):
                 logger.info(f'Found show [{show["title"]}] with id [{show["id"]}]')
 
-                show_path = sonarr.get_show_path(show['id'])
+                # The /series payload behind get_all_shows already has the path
+                show_path = show.get('path') or sonarr.get_show_path(show['id'])
                 adjusted_show_path = adjust_path_for_network(show_path)
                 source_path = os.path.join(source_folder, directory)
 
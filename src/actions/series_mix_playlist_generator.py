@@ -54,10 +54,11 @@ for show_name in tv_shows:
 
     episode_counters[show_name] = episode_counter
 
-# Initialize a set to keep track of added episode IDs
+# Initialize a set to keep track of added episode IDs, and the ordered list to add to the playlist
 added_episode_ids = set()
+playlist_episode_ids = []
 
-# Loop over the episodes and add them sequentially
+# Loop over the episodes and collect them sequentially
 for i in range(max_episodes):
     for show_name in tv_shows:
         if episode_counters[show_name] < len(all_episodes[show_name]):
@@ -65,8 +66,8 @@ for i in range(max_episodes):
             episode_id = episode["Id"]
 
             if episode_id not in added_episode_ids:
-                emby.add_item_to_playlist(playlist["Id"], episode_id)
-                print(f"Added episode: {show_name} - S{episode['ParentIndexNumber']:02}E{episode['IndexNumber']:02}")
+                playlist_episode_ids.append(episode_id)
+                print(f"Queued episode: {show_name} - S{episode['ParentIndexNumber']:02}E{episode['IndexNumber']:02}")
 
                 if mark_as_unwatched:
                     emby.mark_as_unwatched(episode_id)
@@ -81,4 +82,8 @@ for i in range(max_episodes):
         else:
             print(f"No more episodes for {show_name}")
 
+# Add all the collected episodes in bulk
+emby.add_items_to_playlist(playlist["Id"], playlist_episode_ids)
+print(f"Added {len(playlist_episode_ids)} episodes to the playlist")
+
 print("Playlist creation completed.")
@@ -2,8 +2,8 @@ import os
 import shutil
 import argparse
 import re
-from mutagen import File
-from mutagen.easyid3 import EasyID3
+from src.services.tag_cache import forget_tags, get_tags, prefetch_metadata
+from src.utils.file_utils import DirectoryWalker, FileUtils
 from src.utils.logger import get_action_logger
 logger = get_action_logger("sort_downloaded_albums")
 
@@ -18,21 +18,9 @@ def clean_artist_name(artist):
 
 def get_metadata(file_path):
     try:
-        if file_path.lower().endswith('.mp3'):
-            try:
-                audio = EasyID3(file_path)
-                artist = audio.get('artist', [None])[0]
-                album = audio.get('album', [None])[0]
-            except Exception as e:
-                logger.warning(f"Error reading metadata from {file_path}: {str(e)}. Trying to read ID3 tags from file.")
-                audio = File(file_path)
-                artist = audio.get('artist', [None])[0] if audio else None
-                album = audio.get('album', [None])[0] if audio else None
-
-        else:
-            audio = File(file_path)
-            artist = audio.get('artist', [None])[0]
-            album = audio.get('album', [None])[0]
+        tags = get_tags(file_path)
+        artist = tags.artist if tags else None
+        album = tags.album if tags else None
 
         if artist:
             artist = clean_artist_name(artist)
@@ -47,41 +35,39 @@ def get_metadata(file_path):
         return None, None
 
 def delete_empty_folders(path):
-    for root, dirs, files in os.walk(path, topdown=False):
-        for dir in dirs:
-            dir_path = os.path.join(root, dir)
-            try:
-                if not os.listdir(dir_path):
-                    try:
-                        os.rmdir(dir_path)
-                        logger.info(f"Deleted empty folder: {dir_path}")
-                    except Exception as e:
-                        logger.error(f"Error deleting empty folder {dir_path}: {str(e)}")
-            except Exception as e:
-                logger.error(f"Error listing files in {dir_path}: {str(e)}")
+    FileUtils.remove_empty_dirs(logger, path)
 
 async def organize_music(source_dir, destination_dir, dry_run=True):
     logger.info(f"Organizing music in {source_dir} to {destination_dir}")
 
-    # Count total number of folders
-    total_folders = sum([len(dirs) for _, dirs, _ in os.walk(source_dir)])
-    processed_folders = 0
+    try:
+        has_folders = bool(FileUtils.get_directories(source_dir))
+    except OSError as e:
+        # A missing or unreachable download folder is skipped, like an empty one
+        logger.warning(f"Could not list source directory {source_dir}: {str(e)}")
+        has_folders = False
 
-    if total_folders == 0:
+    if not has_folders:
         logger.warning("No folders found in source directory. Exiting.")
         return
 
-    for root, dirs, files in os.walk(source_dir):
-        processed_folders += 1
-        progress_percentage = (processed_folders / total_folders) * 100
-        logger.info(f"Processing folder {processed_folders}/{total_folders} ({progress_percentage:.2f}%): {root}")
+    # One bottom-up pass: a folder's subfolders are done by the time it is processed,
+    # so it can be removed right away once everything in it was moved
+    walker = DirectoryWalker(source_dir, topdown=False, logger=logger)
+    for root, dirs, files in walker:
+        logger.info(f"Processing folder {walker.visited} ({walker.discovered} found so far): {root}")
 
-        for file in files:
+        # Read the folder's tags concurrently, then move the files one by one in listing order
+        metadata = prefetch_metadata([entry.path for entry in files
+                                      if entry.name.lower().endswith(AUDIO_EXTENSIONS)], get_metadata)
+
+        for entry in files:
+            file = entry.name
             logger.debug(f"Checking {file}")
-            file_path = os.path.join(root, file)
+            file_path = entry.path
 
             if file.lower().endswith(AUDIO_EXTENSIONS):
-                artist, album = get_metadata(file_path)
+                artist, album = metadata[file_path]
 
                 if artist is None or album is None:
                     logger.warning(f"Skipping {file_path} due to missing metadata")
@@ -99,6 +85,8 @@ async def organize_music(source_dir, destination_dir, dry_run=True):
                     try:
                         os.makedirs(new_dir, exist_ok=True)
                         shutil.move(file_path, new_file_path)
+                        walker.removed(file_path)
+                        forget_tags(file_path)
                         logger.info(f"Moved {file} to {new_file_path}")
                     except Exception as e:
                         logger.error(f"Error moving {file}: {str(e)}")
@@ -108,12 +96,18 @@ async def organize_music(source_dir, destination_dir, dry_run=True):
                 else:
                     try:
                         os.remove(file_path)
+                        walker.removed(file_path)
                         logger.info(f"Deleted non-audio file {file_path}")
                     except Exception as e:
                         logger.error(f"Error deleting non-audio file {file_path}: {str(e)}")
 
-    if not dry_run:
-        delete_empty_folders(source_dir)
+        if not dry_run and root != walker.top and walker.is_empty(root):
+            try:
+                os.rmdir(root)
+                walker.removed(root)
+                logger.info(f"Deleted empty folder: {root}")
+            except OSError as e:
+                logger.error(f"Error deleting empty folder {root}: {str(e)}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Organize music files based on metadata.")
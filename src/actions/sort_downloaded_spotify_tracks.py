@@ -5,6 +5,7 @@ import re
 import sys
 import filecmp
 
+from src.utils.file_utils import DirectoryWalker
 from src.utils.logger import get_action_logger
 logger = get_action_logger('sort_downloaded_spotify_tracks')
 
@@ -64,10 +65,15 @@ def process_file(file_path, output_file_path, dry_run=False):
 
 
 async def sort_downloaded_spotify_tracks(input_dir, output_dir, dry_run=False, keep_source=False):
-    for root, dirs, files in os.walk(input_dir):
-        for file in files:
+    # Bottom-up, so a source folder can be removed as soon as everything in it was moved
+    remove_source = not keep_source and not dry_run
+    walker = DirectoryWalker(input_dir, topdown=False, logger=logger)
+    for root, dirs, files in walker:
+        file_names = {entry.name for entry in files}
+        for entry in files:
+            file = entry.name
             if file.endswith(".mp3"):
-                file_path = os.path.join(root, file)
+                file_path = entry.path
 
                 try:
                     tag = tinytag.TinyTag.get(file_path)
@@ -103,9 +109,10 @@ async def sort_downloaded_spotify_tracks(input_dir, output_dir, dry_run=False, k
                 output_file_path = os.path.join(output_album_dir, new_file_name)
 
                 if process_file(file_path, output_file_path, dry_run):
-                    if not keep_source and not dry_run:
+                    if remove_source:
                         try:
                             os.remove(file_path)
+                            walker.removed(file_path)
                             logger.info(f"Deleted source file: {file_path}")
                         except Exception as e:
                             logger.error(f"Error deleting source file {file_path}: {e}")
@@ -113,28 +120,26 @@ async def sort_downloaded_spotify_tracks(input_dir, output_dir, dry_run=False, k
                 # Process lyrics file
                 lyrics_file = os.path.splitext(file)[0] + ".lrc"
                 lyrics_file_path = os.path.join(root, lyrics_file)
-                if os.path.exists(lyrics_file_path):
+                if lyrics_file in file_names:
                     output_lyrics_file_path = os.path.join(output_album_dir,
                                                            os.path.splitext(new_file_name)[0] + ".lrc")
                     if process_file(lyrics_file_path, output_lyrics_file_path):
-                        if not keep_source and not dry_run:
+                        if remove_source:
                             try:
                                 os.remove(lyrics_file_path)
+                                walker.removed(lyrics_file_path)
                                 logger.info(f"Deleted source lyrics file: {lyrics_file_path}")
                             except Exception as e:
                                 logger.error(f"Error deleting source lyrics file {lyrics_file_path}: {e}")
 
-    # Clean up empty directories in the source if deleting source files
-    if not keep_source and not dry_run:
-        for root, dirs, files in os.walk(input_dir, topdown=False):
-            for dir in dirs:
-                dir_path = os.path.join(root, dir)
-                if not os.listdir(dir_path):
-                    try:
-                        os.rmdir(dir_path)
-                        logger.info(f"Removed empty directory: {dir_path}")
-                    except Exception as e:
-                        logger.error(f"Error removing empty directory {dir_path}: {e}")
+        # Clean up empty directories in the source if deleting source files
+        if remove_source and root != walker.top and walker.is_empty(root):
+            try:
+                os.rmdir(root)
+                walker.removed(root)
+                logger.info(f"Removed empty directory: {root}")
+            except Exception as e:
+                logger.error(f"Error removing empty directory {root}: {e}")
 
 
 if __name__ == "__main__":
@@ -1,115 +1,84 @@
 import requests
 from src.config import Config
-from src.utils.string_utils import StringUtils
+from src.clients.db_client import get_database
 from src.clients.emby_client import EmbyClient
 from src.clients.spotify_client import SpotifyClient
+from src.services.download_queue import DownloadQueue
+from src.services.playlist_service import sync_playlist_items
 from src.utils.logger import get_action_logger
-import sqlite3
+from datetime import datetime, timedelta
 
 logger = get_action_logger("sync_spotify_liked")
 
-def sync_spotify_liked(spot, emby, config_root="/app/config/"):
-    # Connect to the SQLite database (it will be created if it doesn't exist)
-    conn = sqlite3.connect(config_root + Config.DATABASE_FILE_NAME)
-    c = conn.cursor()
+LIKED_SONG_PRIORITY = 1
 
-    # Create the table to store unmatched songs if it doesn't exist
-    c.execute('''CREATE TABLE IF NOT EXISTS unmatched_songs
-                 (playlist_name TEXT, track_name TEXT, artist_name TEXT, album_name TEXT)''')
 
-    # Get the user's playlists from Spotify
-    playlists = spot.get_playlists()
-    # Iterate over each Spotify playlist
-    playlist_name = "Favorites"
-    playlist_id = "0"
-    playlist_owner = "Dane"
-    logger.info(f"Processing Spotify playlist: {playlist_name} ({playlist_owner})")
+def get_liked_sync_state(db, playlist_name):
+    return db.fetch_one('SELECT emby_playlist_id, last_added_at, full_sync_at FROM spotify_liked_sync '
+                        'WHERE playlist_name = ?', (playlist_name,))
 
-    emby_playlist_name = f"{playlist_name} ({playlist_owner})"
 
-    emby_playlist_search_results = emby.search(emby_playlist_name, 'Playlist')
+def save_liked_sync_state(db, playlist_name, emby_playlist_id, last_added_at, full_sync_at):
+    db.execute_query('INSERT OR REPLACE INTO spotify_liked_sync VALUES (?, ?, ?, ?)',
+                     (playlist_name, emby_playlist_id, last_added_at, full_sync_at))
 
-    if emby_playlist_search_results:
-        # Delete the existing playlist
-        existing_playlist_id = emby_playlist_search_results[0]["Id"]
 
-        for existing_playlist in emby_playlist_search_results:
-            if (
-                    existing_playlist["Name"] == emby_playlist_name
-                    and existing_playlist["Type"] == "Playlist"
-            ):
-                emby.delete_playlist(existing_playlist['Id'])
-                logger.info(
-                    f"Deleted existing Emby playlist: {emby_playlist_name} (ID: {existing_playlist_id})"
-                )
+def needs_full_sync(state, emby_playlist_id, now, full_sync_days=Config.LIKED_FULL_SYNC_DAYS):
+    """
+    Only new likes are appended between full syncs; a full sync also removes unliked songs.
+    It runs on the first sync, when the Emby playlist changed, or every full_sync_days.
+    """
+    if state is None:
+        return True
+    last_emby_playlist_id, last_added_at, full_sync_at = state
+    if last_emby_playlist_id != emby_playlist_id or not last_added_at or not full_sync_at:
+        return True
+    return now - datetime.fromisoformat(full_sync_at) >= timedelta(days=full_sync_days)
+
+
+def get_or_create_favorites_playlist(emby, emby_playlist_name):
+    emby_playlist_search_results = emby.search(emby_playlist_name, 'Playlist') or []
+    for existing_playlist in emby_playlist_search_results:
+        if existing_playlist["Name"] == emby_playlist_name and existing_playlist["Type"] == "Playlist":
+            logger.info(f"Updating existing Emby playlist: {emby_playlist_name} (ID: {existing_playlist['Id']})")
+            return existing_playlist
 
     # Create a new playlist in Emby
     try:
         emby_playlist = emby.create_playlist(emby_playlist_name, 'Audio')
-        logger.info(
-            f"Created Emby playlist: {playlist_name} (ID: {emby_playlist["Id"]})"
-        )
-        # Get the playlist image from Spotify
-        # playlist_image_data = spot.get_playlist_image(playlist_id)
-        # if playlist_image_data:
-        #     try:
-        #         emby.upload_image_data(emby_playlist['Id'], playlist_image_data)
-        #         logging.info(f"Uploaded playlist cover image for '{playlist_name}'")
-        #     except requests.exceptions.RequestException as e:
-        #         logging.warning(f"Error uploading playlist cover image: {str(e)}")
-        # else:
-        #     logging.warning(f"No playlist cover image found for '{playlist_name}'")
+        logger.info(f"Created Emby playlist: {emby_playlist_name} (ID: {emby_playlist['Id']})")
+        return emby_playlist
     except (requests.exceptions.RequestException, KeyError) as e:
-        logger.error(f"Error creating Emby playlist: {playlist_name}")
+        logger.error(f"Error creating Emby playlist: {emby_playlist_name}")
         logger.error(f"Error message: {str(e)}")
+        return None
 
-    # Get the tracks in the Spotify playlist
-    tracks = spot.get_liked_songs()
 
-    logger.info(f"Processing {len(tracks)} tracks in Spotify playlist")
-    # Iterate over each track in the Spotify playlist
-    added_tracks = 0
+def match_liked_tracks(tracks, emby, spot, playlist_name):
+    """
+    Search Emby for each liked track. Returns (matched item ids, unmatched rows for the database).
+    """
+    matched_item_ids = []
     unmatched_tracks = []
     for track in tracks:
         track_name = track["track"]["name"]
         artist_name = track["track"]["artists"][0]["name"]
         album_name = track["track"]["album"]["name"]
-        clean_track_name = StringUtils.remove_special_characters(track_name)
-        clean_artist_name = StringUtils.remove_special_characters(artist_name)
 
         emby_search_results = emby.search_for_track(track_name, artist_name)
-        emby_search_results_cleaned = emby.search_for_track(
-            clean_track_name, clean_artist_name
-        )
 
         if emby_search_results:
-            found_match = False
-            for result in emby_search_results:
-                if found_match:
-                    break
-
-                emby_item_id = result["Id"]
-
-                logger.debug(f'Matching {track["track"]["name"]} with {result["Name"]}')
-                if spot.match_song(track["track"], result):
-                    logger.debug(f"Matched track: {track_name}")
-                    try:
-                        emby.add_item_to_playlist(emby_playlist['Id'], emby_item_id)
-                        logger.info(
-                            f"Added '{track_name}' by {artist_name} to Emby playlist"
-                        )
-                        found_match = True
-                        added_tracks += 1
-                    except requests.exceptions.RequestException as e:
-                        logger.warning(
-                            f"Error adding track to Emby playlist: {track_name}"
-                        )
-                        logger.warning(f"Error message: {str(e)}")
-                else:
-                    logger.warning(
-                        f"No match found for '{track_name}' by {artist_name} in Emby, failed match_song"
-                    )
-                    logger.warning(f"SPOTIFY: {track_name} by {artist_name}")
+            logger.debug(f'Matching {track["track"]["name"]} against {len(emby_search_results)} Emby candidates')
+            index, _ = spot.match_songs(track["track"], emby_search_results)
+            if index is not None:
+                logger.debug(f"Matched track: {track_name}")
+                matched_item_ids.append(emby_search_results[index]["Id"])
+            else:
+                logger.warning(
+                    f"No match found for '{track_name}' by {artist_name} in Emby, failed match_song"
+                )
+                logger.warning(f"SPOTIFY: {track_name} by {artist_name}")
+                for result in emby_search_results:
                     logger.warning(
                         f"EMBY: {result['Name']} by {result.get('Artists', [])}"
                     )
@@ -119,20 +88,63 @@ def sync_spotify_liked(spot, emby, config_root="/app/config/"):
             )
             unmatched_tracks.append((playlist_name, track_name, artist_name, album_name))
 
-    # Insert the unmatched songs into the database
-    c.executemany('INSERT INTO unmatched_songs VALUES (?, ?, ?, ?)', unmatched_tracks)
-    conn.commit()
+    return matched_item_ids, unmatched_tracks
+
+
+def sync_spotify_liked(spot, emby, config_root="/app/config/", force_full_sync=False):
+    # Open the shared state database (it will be created and migrated if needed)
+    db = get_database(config_root + Config.DATABASE_FILE_NAME)
+
+    playlist_name = "Favorites"
+    playlist_owner = "Dane"
+    logger.info(f"Processing Spotify playlist: {playlist_name} ({playlist_owner})")
+
+    emby_playlist_name = f"{playlist_name} ({playlist_owner})"
+    emby_playlist = get_or_create_favorites_playlist(emby, emby_playlist_name)
+    if emby_playlist is None:
+        return
+
+    now = datetime.now()
+    state = get_liked_sync_state(db, emby_playlist_name)
+    full_sync = force_full_sync or needs_full_sync(state, emby_playlist['Id'], now)
+
+    # Get the tracks in the Spotify playlist, only the ones liked since the last run unless reconciling
+    if full_sync:
+        tracks = spot.get_liked_songs()
+    else:
+        tracks = spot.get_liked_songs_since(state[1])
+
+    logger.info(f"Processing {len(tracks)} {'' if full_sync else 'new '}tracks in Spotify playlist")
+    matched_item_ids, unmatched_tracks = match_liked_tracks(tracks, emby, spot, playlist_name)
+
+    try:
+        if full_sync:
+            # Apply only the difference, which also drops songs that were unliked
+            added, removed = sync_playlist_items(emby, emby_playlist['Id'], matched_item_ids)
+            logger.info(f"Emby playlist '{emby_playlist_name}' reconciled: {added} added, {removed} removed")
+        elif matched_item_ids:
+            emby.add_items_to_playlist(emby_playlist['Id'], matched_item_ids)
+            logger.info(f"Added {len(matched_item_ids)} tracks to Emby playlist")
+
+        added_at = [track["added_at"] for track in tracks]
+        if state and state[1]:
+            added_at.append(state[1])
+        full_sync_at = now.isoformat() if full_sync else state[2]
+        save_liked_sync_state(db, emby_playlist_name, emby_playlist['Id'], max(added_at, default=None), full_sync_at)
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Error adding tracks to Emby playlist: {playlist_name}")
+        logger.warning(f"Error message: {str(e)}")
+
+    # Queue the unmatched songs for download, ahead of songs only found in playlists
+    download_queue = DownloadQueue(config_root + Config.DATABASE_FILE_NAME)
+    download_queue.enqueue(unmatched_tracks, priority=LIKED_SONG_PRIORITY)
+    download_queue.close()
 
     # Calculate the match percentage for the current playlist
     if len(tracks) > 0:
-        match_percentage = (added_tracks / len(tracks)) * 100
+        match_percentage = (len(matched_item_ids) / len(tracks)) * 100
         logger.info(f"Match percentage for playlist '{playlist_name}': {match_percentage:.2f}%")
 
-    added_tracks = 0
-
-    # Close the database connection
-    conn.close()
-
 
 if __name__ == "__main__":
     # Get the user's playlists from Spotify
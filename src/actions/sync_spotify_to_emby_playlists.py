@@ -1,40 +1,151 @@
 import requests
 
 from src.config import Config
+from src.clients.db_client import get_database
 from src.utils.string_utils import StringUtils
 from src.clients.emby_client import EmbyClient
 from src.clients.spotify_client import SpotifyClient, clean_title
+from src.services.download_queue import DownloadQueue
+from src.services.emby_library_index import EmbyLibraryIndex
+from src.services.match_cache import MatchCache
+from src.services.playlist_service import sync_playlist_items
 from src.utils.logger import get_action_logger
 
-import sqlite3
+from datetime import datetime
 
 logger = get_action_logger("sync_spotify_to_emby_playlists")
 
-def try_match_and_add(track_name, artist_name, emby_playlist, emby, spot):
-    emby_search_results = emby.search_for_track(track_name, artist_name)
+# Score recorded for matches made by ISRC, above anything fuzzy matching can produce
+EXACT_ID_SCORE = 200
+
+def find_emby_match(track_name, artist_name, emby, spot, library_index=None):
+    """
+    Return (Id, score) of the Emby item matching the track, or (None, 0) if nothing matches.
+    """
+    if library_index is not None:
+        emby_search_results = library_index.find_candidates(track_name, artist_name)
+    else:
+        emby_search_results = emby.search_for_track(track_name, artist_name)
 
     if emby_search_results:
-        for result in emby_search_results:
-            emby_item_id = result["Id"]
-            logger.debug(f'Matching {track_name} with {result["Name"]}')
-            if spot.match_song({"name": track_name, "artists": [{"name": artist_name}]}, result):
-                try:
-                    logger.info(f'Found match: {track_name} by {artist_name} in Emby')
-                    emby.add_item_to_playlist(emby_playlist['Id'], emby_item_id)
-                    logger.info(f"Added '{track_name}' by {artist_name} to Emby playlist")
-                    return True
-                except requests.exceptions.RequestException as e:
-                    logger.warning(f"Error adding track to Emby playlist: {track_name}")
-                    logger.warning(f"Error message: {str(e)}")
-    return False
-
-
-async def sync_spotify_playlists(spot, emby, config_root="/app/config/"):
-    conn = sqlite3.connect(config_root + 'unmatched_songs.db')
-    c = conn.cursor()
-    # Create the table to store unmatched songs if it doesn't exist
-    c.execute('''CREATE TABLE IF NOT EXISTS unmatched_songs
-                 (playlist_name TEXT, track_name TEXT, artist_name TEXT, album_name TEXT)''')
+        logger.debug(f'Matching {track_name} against {len(emby_search_results)} Emby candidates')
+        index, score = spot.match_songs({"name": track_name, "artists": [{"name": artist_name}]}, emby_search_results)
+        if index is not None:
+            logger.info(f'Found match: {track_name} by {artist_name} in Emby')
+            return emby_search_results[index]["Id"], score
+    return None, 0
+
+
+def match_track(track_name, artist_name, emby, spot, library_index=None, isrc=None):
+    """
+    Match a Spotify track to an Emby item: exact ISRC lookup in the library index first, then fuzzy
+    matching, retrying with cleaned names if the raw names don't match.
+    Returns (Id, score), or (None, 0).
+    """
+    if library_index is not None and isrc:
+        exact_match = library_index.find_by_ids(isrc=isrc)
+        if exact_match:
+            logger.info(f'Found ISRC match: {track_name} by {artist_name} in Emby')
+            return exact_match["Id"], EXACT_ID_SCORE
+
+    emby_item_id, score = find_emby_match(track_name, artist_name, emby, spot, library_index)
+    if emby_item_id:
+        return emby_item_id, score
+
+    clean_track_name = clean_title(track_name)
+    clean_artist_name = StringUtils.remove_special_characters(artist_name)
+    if clean_track_name != track_name or clean_artist_name != artist_name:
+        emby_item_id, score = find_emby_match(clean_track_name, clean_artist_name, emby, spot, library_index)
+        if emby_item_id:
+            return emby_item_id, score
+
+    logger.warning(f"No match found for '{track_name}' by {artist_name} in Emby / clean: {clean_track_name}")
+    return None, 0
+
+
+def get_or_create_emby_playlist(emby, spot, emby_playlist_name, playlist_id, sync_mode):
+    """
+    Find the Emby playlist for a Spotify playlist, creating it (with cover art) if needed.
+    In rebuild mode any existing playlist with the same name is deleted first.
+    """
+    emby_playlist_search_results = emby.search(emby_playlist_name, 'Playlist') or []
+    existing_playlists = [
+        existing_playlist for existing_playlist in emby_playlist_search_results
+        if existing_playlist["Name"] == emby_playlist_name and existing_playlist["Type"] == "Playlist"
+    ]
+
+    if sync_mode == "incremental" and existing_playlists:
+        emby_playlist = existing_playlists[0]
+        logger.info(f"Updating existing Emby playlist: {emby_playlist_name} (ID: {emby_playlist['Id']})")
+        return emby_playlist
+
+    for existing_playlist in existing_playlists:
+        emby.delete_playlist(existing_playlist['Id'])
+        logger.info(f"Deleted existing Emby playlist: {emby_playlist_name} (ID: {existing_playlist['Id']})")
+
+    # Create a new playlist in Emby
+    try:
+        emby_playlist = emby.create_playlist(emby_playlist_name, 'Audio')
+        logger.info(f"Created Emby playlist: {emby_playlist_name} (ID: {emby_playlist['Id']})")
+    except (requests.exceptions.RequestException, KeyError) as e:
+        logger.error(f"Error creating Emby playlist: {emby_playlist_name}")
+        logger.error(f"Error message: {str(e)}")
+        return None
+
+    # Get the playlist image from Spotify
+    playlist_image_data = spot.get_playlist_image(playlist_id)
+    if playlist_image_data:
+        try:
+            emby.upload_image_data(emby_playlist['Id'], playlist_image_data)
+            logger.info(f"Uploaded playlist cover image for '{emby_playlist_name}'")
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Error uploading playlist cover image: {str(e)}")
+    else:
+        logger.warning(f"No playlist cover image found for '{emby_playlist_name}'")
+
+    return emby_playlist
+
+
+def get_playlist_snapshot(db, playlist_id):
+    return db.fetch_one('''SELECT snapshot_id, emby_playlist_id, unmatched_count, library_size
+                           FROM spotify_playlist_snapshots WHERE playlist_id = ?''', (playlist_id,))
+
+
+def save_playlist_snapshot(db, playlist_id, snapshot_id, emby_playlist_id, unmatched_count, library_size):
+    db.execute_query('INSERT OR REPLACE INTO spotify_playlist_snapshots VALUES (?, ?, ?, ?, ?, ?)',
+                     (playlist_id, snapshot_id, emby_playlist_id, unmatched_count, library_size,
+                      datetime.now().isoformat()))
+
+
+def is_playlist_unchanged(snapshot, playlist, emby_playlists_by_id, library_size):
+    """
+    A playlist can be skipped when its Spotify snapshot hasn't changed since the last sync,
+    its Emby playlist still exists, and there is no chance newly added Emby tracks would
+    match songs that were unmatched last time.
+    """
+    if snapshot is None or not playlist.get("snapshot_id"):
+        return False
+
+    snapshot_id, emby_playlist_id, unmatched_count, last_library_size = snapshot
+    if snapshot_id != playlist["snapshot_id"] or emby_playlist_id not in emby_playlists_by_id:
+        return False
+
+    return unmatched_count == 0 or (library_size is not None and library_size == last_library_size)
+
+
+async def sync_spotify_playlists(spot, emby, config_root="/app/config/", use_library_index=True,
+                                 sync_mode=Config.PLAYLIST_SYNC_MODE, ignore_snapshots=False):
+    db = get_database(config_root + Config.DATABASE_FILE_NAME)
+    # Unmatched songs go to the download queue
+    download_queue = DownloadQueue(config_root + Config.DATABASE_FILE_NAME)
+
+    # Load the Emby audio library once so tracks are matched locally instead of searched one by one
+    library_index = EmbyLibraryIndex.build(emby) if use_library_index else None
+    library_size = len(library_index) if library_index is not None else None
+    # Cached matches are only trusted when the index can confirm the Emby item still exists
+    match_cache = MatchCache(config_root + Config.DATABASE_FILE_NAME) if library_index is not None else None
+
+    emby_playlists_by_id = {emby_playlist["Id"]: emby_playlist for emby_playlist in emby.get_playlists()}
 
     playlists = spot.get_playlists()
     featured_playlists = spot.get_featured_playlists()
@@ -44,12 +155,9 @@ async def sync_spotify_playlists(spot, emby, config_root="/app/config/"):
     categories = ["Made for You", "Pop", "Country", "Fall", "Mood","Indie", "Charts", "Discover", "In the Car"]
 
     all_playlists = playlists["items"] + featured_playlists["items"]
-    # get all the playlists from the categories
-    for category in categories:
-        logger.info(f"Getting playlists from category: {category}")
-        category_playlists = spot.get_category_playlists_by_name(category)
-        if category_playlists:
-            all_playlists += category_playlists["items"]
+    # get all the playlists from the categories, listing the categories only once
+    logger.info(f"Getting playlists from categories: {', '.join(categories)}")
+    all_playlists += spot.get_categories_playlists(categories)
 
     # print(json.dumps(featured_playlists, indent=4))
 
@@ -57,59 +165,45 @@ async def sync_spotify_playlists(spot, emby, config_root="/app/config/"):
 
     # all_playlists = playlists["items"] + featured_playlists["items"] #+ made_for_you["items"]
 
-    # Iterate over each Spotify playlist
+    # Drop playlists that show up in several sources and the ones unchanged since the last sync,
+    # before any of their tracks are fetched
+    pending_playlists = {}
     for playlist in all_playlists:
+        if not playlist or playlist["id"] in pending_playlists:
+            continue
+
+        snapshot = get_playlist_snapshot(db, playlist["id"])
+        if not ignore_snapshots and is_playlist_unchanged(snapshot, playlist, emby_playlists_by_id, library_size):
+            logger.info(f"Skipping unchanged Spotify playlist: {playlist['name']} (snapshot {playlist['snapshot_id']})")
+            continue
+        pending_playlists[playlist["id"]] = (playlist, snapshot)
+
+    # Fetch the full track manifest concurrently before matching starts
+    manifest = spot.get_playlists_tracks(pending_playlists.keys())
+
+    # Iterate over each Spotify playlist
+    for playlist_id, (playlist, snapshot) in pending_playlists.items():
         playlist_name = playlist["name"]
-        playlist_id = playlist["id"]
         playlist_owner = playlist["owner"]["display_name"]
         logger.info(f"Processing Spotify playlist: {playlist_name} ({playlist_owner})")
 
         emby_playlist_name = f"{playlist_name} ({playlist_owner})"
 
-        emby_playlist_search_results = emby.search(emby_playlist_name, 'Playlist')
-
-        if emby_playlist_search_results:
-            # Delete the existing playlist
-            existing_playlist_id = emby_playlist_search_results[0]['Id']
+        tracks = manifest.get(playlist_id)
+        if tracks is None:
+            continue
 
-            for existing_playlist in emby_playlist_search_results:
-                if (
-                        existing_playlist["Name"] == emby_playlist_name
-                        and existing_playlist["Type"] == "Playlist"
-                ):
-                    emby.delete_playlist(existing_playlist['Id'])
-                    logger.info(
-                        f"Deleted existing Emby playlist: {emby_playlist_name} (ID: {existing_playlist_id})"
-                    )
-
-        # Create a new playlist in Emby
-        try:
-            emby_playlist = emby.create_playlist(emby_playlist_name, 'Audio')
-            logger.info(
-                f"Created Emby playlist: {playlist_name} (ID: {emby_playlist['Id']})"
-            )
-            # Get the playlist image from Spotify
-            playlist_image_data = spot.get_playlist_image(playlist_id)
-            if playlist_image_data:
-                try:
-                    emby.upload_image_data(emby_playlist['Id'], playlist_image_data)
-                    logger.info(f"Uploaded playlist cover image for '{playlist_name}'")
-                except requests.exceptions.RequestException as e:
-                    logger.warning(f"Error uploading playlist cover image: {str(e)}")
-            else:
-                logger.warning(f"No playlist cover image found for '{playlist_name}'")
-
-
-        except (requests.exceptions.RequestException, KeyError) as e:
-            logger.error(f"Error creating Emby playlist: {playlist_name}")
-            logger.error(f"Error message: {str(e)}")
-
-        # Get the tracks in the Spotify playlist
-        tracks = spot.get_playlist_tracks(playlist_id)
+        if sync_mode == "incremental" and snapshot and snapshot[1] in emby_playlists_by_id:
+            emby_playlist = emby_playlists_by_id[snapshot[1]]
+        else:
+            emby_playlist = get_or_create_emby_playlist(emby, spot, emby_playlist_name, playlist_id, sync_mode)
+        if emby_playlist is None:
+            continue
+        emby_playlists_by_id[emby_playlist['Id']] = emby_playlist
 
         logger.info(f"Processing {len(tracks)} tracks in Spotify playlist")
         # Iterate over each track in the Spotify playlist
-        added_tracks = 0
+        matched_item_ids = []
         unmatched_tracks = []
         for track in tracks:
 
@@ -129,36 +223,47 @@ async def sync_spotify_playlists(spot, emby, config_root="/app/config/"):
             if album_name is None:
                 album_name = "Unknown Album"
 
-            if try_match_and_add(track_name, artist_name, emby_playlist, emby, spot):
-                added_tracks += 1
-                continue
-
-            clean_track_name = clean_title(track_name)
-            clean_artist_name = StringUtils.remove_special_characters(artist_name)
-            if clean_track_name != track_name or clean_artist_name != artist_name:
-                if try_match_and_add(clean_track_name, clean_artist_name, emby_playlist, emby, spot):
-                    added_tracks += 1
+            spotify_track_id = track["track"].get("id")
+            if match_cache is not None:
+                emby_item_id = match_cache.get(spotify_track_id, library_index)
+                if emby_item_id:
+                    matched_item_ids.append(emby_item_id)
                     continue
 
-            logger.warning(f"No match found for '{track_name}' by {artist_name} in Emby / clean: {clean_track_name}")
-            # logging.warning(f"Cleaned track name: {clean_track_name}")
-            # logging.warning(f"Cleaned artist name: {clean_artist_name}")
+            isrc = (track["track"].get("external_ids") or {}).get("isrc")
+            emby_item_id, score = match_track(track_name, artist_name, emby, spot, library_index, isrc)
+            if emby_item_id:
+                matched_item_ids.append(emby_item_id)
+                if match_cache is not None:
+                    match_cache.set(spotify_track_id, emby_item_id, score)
+                continue
 
             unmatched_tracks.append((playlist_name, track_name, artist_name, album_name))
 
-        # Insert the unmatched songs into the database
-        c.executemany('INSERT INTO unmatched_songs VALUES (?, ?, ?, ?)', unmatched_tracks)
-        conn.commit()
+        # Apply only the difference between the Emby playlist and the Spotify track list
+        try:
+            added, removed = sync_playlist_items(emby, emby_playlist['Id'], matched_item_ids)
+            logger.info(f"Emby playlist '{emby_playlist_name}' updated: {added} added, {removed} removed")
+            save_playlist_snapshot(db, playlist_id, playlist.get("snapshot_id"), emby_playlist['Id'],
+                                   len(unmatched_tracks), library_size)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Error updating Emby playlist: {emby_playlist_name}")
+            logger.warning(f"Error message: {str(e)}")
+
+        # Queue the unmatched songs for download
+        download_queue.enqueue(unmatched_tracks)
 
         # Calculate the match percentage for the current playlist
         if len(tracks) > 0:
-            match_percentage = (added_tracks / len(tracks)) * 100
+            match_percentage = (len(matched_item_ids) / len(tracks)) * 100
             logger.info(f"Match percentage for playlist '{playlist_name}': {match_percentage:.2f}%")
 
-        added_tracks = 0
+    if match_cache is not None:
+        logger.info(f"Match cache: {match_cache.hits} hits, {match_cache.misses} misses")
+    logger.info(f"Emby connection stats: {emby.get_connection_stats()}")
 
     # Close the database connection
-    conn.close()
+    download_queue.close()
 
 if __name__ == "__main__":
     spot = SpotifyClient(Config.SPOTIFY_CLIENT_ID, Config.SPOTIFY_CLIENT_SECRET, Config.SPOTIFY_REDIRECT_URI,
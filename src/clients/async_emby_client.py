@@ -0,0 +1,202 @@
+import asyncio
+
+import aiohttp
+
+from src.config import Config
+from src.utils.logger import get_action_logger
+
+logger = get_action_logger("AsyncEmbyClient")
+
+
+class EmbyRequestError(aiohttp.ClientError):
+    """
+    Raised when a request still fails after all of its retries.
+    """
+
+
+class AsyncEmbyClient:
+    """
+    asyncio counterpart of EmbyClient for the playlist and track calls used by the syncs.
+    A semaphore bounds the number of requests in flight, so callers can fan out with
+    asyncio.gather without flooding the server.
+
+    Usage:
+        async with await AsyncEmbyClient.create(url, username, password) as emby:
+            playlists = await emby.get_playlists()
+    """
+
+    def __init__(self, server_url, username, password, max_concurrency=Config.EMBY_MAX_CONCURRENCY,
+                 pool_size=Config.EMBY_POOL_SIZE, timeout=61):
+        self.server_url = server_url
+        self.username = username
+        self.password = password
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=pool_size),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+        self.headers = {
+            "Authorization": f'Emby UserId="{username}", Client="{Config.EMBY_CLIENT}", Device="{Config.EMBY_DEVICE}", DeviceId="{Config.EMBY_DEVICE_ID}", Version="{Config.EMBY_VERSION}"',
+            "Content-Type": "application/json",
+        }
+        self.user = None
+        self.user_id = None
+
+    @classmethod
+    async def create(cls, server_url, username, password, **kwargs):
+        client = cls(server_url, username, password, **kwargs)
+        try:
+            await client.authenticate()
+        except Exception:
+            await client.close()
+            raise
+        return client
+
+    async def authenticate(self):
+        emby_auth_url = f"{self.server_url}/Users/AuthenticateByName"
+        emby_auth_data = {"username": self.username, "pw": self.password}
+
+        async with self.session.post(emby_auth_url, json=emby_auth_data, headers=self.headers) as response:
+            response.raise_for_status()
+            emby_auth_response = await response.json()
+
+        self.user = emby_auth_response["User"]
+        self.user_id = self.user['Id']
+        self.headers["X-Emby-Token"] = emby_auth_response["AccessToken"]
+
+    async def close(self):
+        await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _build_url(self, path):
+        return f'{self.server_url}/emby/{path}'
+
+    async def _request_with_retry(self, method, path, params=None, retries=6, delay=1):
+        url = self._build_url(path)
+        for attempt in range(retries):
+            try:
+                async with self.semaphore:
+                    async with self.session.request(method, url, params=params, headers=self.headers) as response:
+                        response.raise_for_status()
+                        if response.content_type == 'application/json':
+                            return await response.json()
+                        return await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Request failed: {e}")
+                if attempt < retries - 2:
+                    logger.info(f"Retrying in {delay} seconds...")
+                    await asyncio.sleep(delay)
+        raise EmbyRequestError(f"Failed to make the request after {retries} attempts: {method} {url}")
+
+    async def _get_request(self, path, params=None):
+        return await self._request_with_retry('GET', path, params)
+
+    async def _post_request(self, path, params=None):
+        return await self._request_with_retry('POST', path, params)
+
+    async def _delete_request(self, path, params=None):
+        return await self._request_with_retry('DELETE', path, params)
+
+    async def create_playlist(self, name, type, user_id=None):
+        if user_id is None:
+            user_id = self.user_id
+
+        playlist = await self._post_request('Playlists', {'Name': name, 'userId': user_id})
+        logger.info(f"Created playlist: {playlist['Name']} ({playlist['Id']})")
+        return playlist
+
+    async def iter_items(self, parent_id=None, page_size=200, fields=None, include_item_types=None,
+                         recursive=False, **params):
+        """
+        Async generator over the user's items, fetching one StartIndex/Limit page at a time.
+        """
+        query = dict(params)
+        if parent_id is not None:
+            query['ParentId'] = parent_id
+        if fields:
+            query['Fields'] = fields
+        if include_item_types:
+            query['IncludeItemTypes'] = include_item_types
+        if recursive:
+            query['Recursive'] = 'true'
+        query['EnableTotalRecordCount'] = 'false'
+
+        start_index = 0
+        while True:
+            query['StartIndex'] = start_index
+            query['Limit'] = page_size
+            response = await self._get_request(f'Users/{self.user_id}/Items', query)
+            items = response.get('Items', [])
+
+            for item in items:
+                yield item
+
+            start_index += len(items)
+            if len(items) < page_size:
+                break
+
+    async def get_playlists(self):
+        return [item async for item in self.iter_items(fields='ChildCount,RecursiveItemCount,Taglines',
+                                                       include_item_types='playlist',
+                                                       recursive=True,
+                                                       SortBy='SortName',
+                                                       SortOrder='Ascending')]
+
+    async def get_list_items(self, list_id, fields=None):
+        items = [item async for item in self.iter_items(list_id, fields=fields)]
+        total_count = len(items)
+        logger.info(f'Found {total_count} items in playlist')
+        return items, total_count
+
+    async def add_item_to_playlist(self, playlist_id, item_id):
+        return await self._post_request(f'Playlists/{playlist_id}/Items', {'Ids': item_id})
+
+    async def add_items_to_playlist(self, playlist_id, item_ids, chunk_size=100):
+        """
+        Add many items to a playlist with one request per chunk of comma-separated ids.
+        Chunks are sent one after another so the items keep their order in the playlist.
+        """
+        item_ids = list(item_ids)
+        responses = []
+        for start in range(0, len(item_ids), chunk_size):
+            chunk = item_ids[start:start + chunk_size]
+            responses.append(await self._post_request(f'Playlists/{playlist_id}/Items', {'Ids': ','.join(chunk)}))
+        return responses
+
+    async def delete_item_from_playlist(self, playlist_id, item_id):
+        return await self._delete_request(f'Playlists/{playlist_id}/Items', {'EntryIds': item_id})
+
+    async def delete_playlist(self, playlist_id):
+        return await self._delete_request(f'Items/{playlist_id}')
+
+    async def search_for_track(self, track_name, artist_name):
+        emby_search_results = None
+        try:
+            emby_search_response = await self._get_request('Items', {
+                'SearchTerm': track_name,
+                'Artists': artist_name,
+                'Recursive': 'true',
+                'IncludeItemTypes': 'Audio',
+                'ExcludeItemTypes': 'Podcast',
+                'Limit': 10,
+            })
+            emby_search_results = emby_search_response["Items"]
+        except (aiohttp.ClientError, KeyError) as e:
+            logger.warning(f"Error searching for track in Emby: {track_name}")
+            logger.warning(f"Error message: {str(e)}")
+
+        return emby_search_results
+
+    async def search_for_tracks(self, tracks):
+        """
+        Search for many (track_name, artist_name) pairs concurrently, results in input order.
+        A search that fails after its retries yields None instead of aborting the others.
+        """
+        return await asyncio.gather(*(
+            self.search_for_track(track_name, artist_name) for track_name, artist_name in tracks
+        ))
@@ -1,67 +1,212 @@
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
+
 from src.config import Config
 from src.utils.logger import get_action_logger
 
 logger = get_action_logger("db_client")
 
+
+def _create_initial_schema(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS spotify_playlist_snapshots
+                    (playlist_id TEXT PRIMARY KEY, snapshot_id TEXT, emby_playlist_id TEXT,
+                     unmatched_count INTEGER, library_size INTEGER, synced_at TIMESTAMP)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS spotify_liked_sync
+                    (playlist_name TEXT PRIMARY KEY, emby_playlist_id TEXT, last_added_at TEXT,
+                     full_sync_at TIMESTAMP)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS spotify_emby_matches
+                    (spotify_track_id TEXT PRIMARY KEY, emby_item_id TEXT NOT NULL, score INTEGER,
+                     matched_at TIMESTAMP)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_spotify_emby_matches_emby_item
+                    ON spotify_emby_matches (emby_item_id)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS download_queue (
+                    id INTEGER PRIMARY KEY,
+                    track_name TEXT NOT NULL,
+                    artist_name TEXT NOT NULL,
+                    album_name TEXT NOT NULL DEFAULT '',
+                    playlist_name TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_retry_at TEXT NOT NULL DEFAULT '',
+                    last_error TEXT,
+                    updated_at TEXT,
+                    UNIQUE (track_name, artist_name, album_name))''')
+    # Serves the claim query: pending jobs in priority order, next_retry_at checked from the index
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_download_queue_claim
+                    ON download_queue (status, priority DESC, id, next_retry_at)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS lyrics_tracking (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    artist TEXT,
+                    album TEXT,
+                    filename TEXT,
+                    lyrics_found BOOLEAN,
+                    last_check_date DATE,
+                    UNIQUE(artist, album, filename))''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_artist_album_filename ON lyrics_tracking(artist, album, filename)')
+
+
+def _import_legacy_song_tables(conn):
+    """
+    Move rows from the old unmatched_songs/downloaded_songs tables into the download queue, then drop them.
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'unmatched_songs' in tables:
+        conn.execute('''INSERT OR IGNORE INTO download_queue (track_name, artist_name, album_name, playlist_name)
+                        SELECT track_name, artist_name, COALESCE(album_name, ''), MIN(playlist_name)
+                        FROM unmatched_songs
+                        WHERE track_name IS NOT NULL AND artist_name IS NOT NULL
+                        GROUP BY track_name, artist_name, COALESCE(album_name, '')''')
+        conn.execute('DROP TABLE unmatched_songs')
+    if 'downloaded_songs' in tables:
+        conn.execute('''INSERT INTO download_queue (track_name, artist_name, album_name, status)
+                        SELECT DISTINCT track_name, artist_name, COALESCE(album_name, ''), 'done'
+                        FROM downloaded_songs
+                        WHERE track_name IS NOT NULL AND artist_name IS NOT NULL
+                        ON CONFLICT (track_name, artist_name, album_name) DO UPDATE SET status = excluded.status''')
+        conn.execute('DROP TABLE downloaded_songs')
+
+
+def _create_audio_tags_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS audio_tags (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    readable INTEGER NOT NULL,
+                    title TEXT,
+                    artist TEXT,
+                    album TEXT,
+                    track_number TEXT,
+                    duration REAL,
+                    musicbrainz_trackid TEXT,
+                    isrc TEXT)''')
+
+
+def _create_arr_catalogs_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS arr_catalogs
+                    (name TEXT PRIMARY KEY, fetched_at TEXT NOT NULL, payload TEXT NOT NULL)''')
+
+
+# Schema migrations, applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    _create_initial_schema,
+    _import_legacy_song_tables,
+    _create_audio_tags_table,
+    _create_arr_catalogs_table,
+]
+
+
 class DatabaseClient:
-    def __init__(self, db_path=Config.DATABASE_FILE_PATH):
+    """
+    Shared SQLite state store. Each thread (and each process after a fork) reuses its own
+    connection in WAL mode, so readers don't block the writer and concurrent workers wait on
+    the busy timeout instead of failing with "database is locked".
+
+    Statements run in autocommit mode unless they are inside a transaction() block.
+    """
+
+    def __init__(self, db_path=Config.DATABASE_FILE_PATH, timeout=30, cached_statements=256):
         self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
 
     def _get_connection(self):
-        try:
-            conn = sqlite3.connect(self.db_path)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
             return conn
+
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None,
+                                   cached_statements=self.cached_statements)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
         except sqlite3.Error as e:
             logger.error(f"Error connecting to database: {e}")
             raise
 
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        self._local.in_transaction = False
+        return conn
+
+    def close(self):
+        """
+        Close this thread's connection; the next query opens a new one.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """
+        Run the enclosed statements as one transaction. immediate=True takes the write lock up front,
+        for read-then-write sequences that must not interleave with another writer.
+        Nested blocks join the outer transaction.
+        """
+        conn = self._get_connection()
+        if self._local.in_transaction:
+            yield conn
+            return
+
+        conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        self._local.in_transaction = True
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            self._local.in_transaction = False
+
+    def migrate(self):
+        """
+        Apply the migrations this database hasn't run yet.
+        """
+        with self.transaction(immediate=True) as conn:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {number}')
+                logger.info(f"Applied database migration {number}: {migration.__name__}")
+
     def execute_query(self, query, params=None):
         conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            conn.commit()
-            return cursor
+            return conn.execute(query, params or ())
+        except sqlite3.Error as e:
+            logger.error(f"Error executing query: {e}")
+            raise
+
+    def executemany(self, query, rows):
+        """
+        Run one statement for many parameter rows inside a single transaction.
+        """
+        try:
+            with self.transaction() as conn:
+                return conn.executemany(query, rows)
         except sqlite3.Error as e:
             logger.error(f"Error executing query: {e}")
-            conn.rollback()
             raise
-        finally:
-            conn.close()
 
     def fetch_all(self, query, params=None):
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor.fetchall()
+            return self._get_connection().execute(query, params or ()).fetchall()
         except sqlite3.Error as e:
             logger.error(f"Error fetching data: {e}")
             raise
-        finally:
-            conn.close()
 
     def fetch_one(self, query, params=None):
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor.fetchone()
+            return self._get_connection().execute(query, params or ()).fetchone()
         except sqlite3.Error as e:
             logger.error(f"Error fetching data: {e}")
             raise
-        finally:
-            conn.close()
 
     def create_table(self, table_name, columns):
         query = f"CREATE TABLE IF NOT EXISTS {table_name} ({columns})"
@@ -86,6 +231,24 @@ class DatabaseClient:
         self.execute_query(query)
         logger.info(f"Data deleted from {table_name}")
 
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(db_path=Config.DATABASE_FILE_PATH):
+    """
+    Return the process-wide DatabaseClient for db_path, migrating the schema on first use.
+    """
+    with _databases_lock:
+        db = _databases.get(db_path)
+        if db is None:
+            db = DatabaseClient(db_path)
+            db.migrate()
+            _databases[db_path] = db
+        return db
+
+
 # Example usage:
 if __name__ == "__main__":
     db = DatabaseClient()
@@ -104,4 +267,4 @@ if __name__ == "__main__":
     db.update_data("songs", {"title": "New Song Name"}, "id = 1")
 
     # Delete data
-    db.delete_data("songs", "id = 1")
\ No newline at end of file
+    db.delete_data("songs", "id = 1")
@@ -6,6 +6,7 @@ import requests
 
 from PIL import Image
 from io import BytesIO
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout
 from mimetypes import guess_type
 
@@ -14,11 +15,17 @@ from src.config import Config
 
 
 class EmbyClient:
-    def __init__(self, server_url, username, password):
+    def __init__(self, server_url, username, password, pool_size=Config.EMBY_POOL_SIZE):
         self.server_url = server_url
         self.username = username
         self.password = password
 
+        # One pooled, keep-alive session per client so sequential requests reuse connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
         emby_auth_url = f"{server_url}/Users/AuthenticateByName"
         emby_auth_data = {"username": username, "pw": password}
         emby_auth_headers = {
@@ -26,7 +33,7 @@ class EmbyClient:
             "Content-Type": "application/json",
         }
 
-        emby_auth_response = requests.post(
+        emby_auth_response = self.session.post(
             emby_auth_url, json=emby_auth_data, headers=emby_auth_headers
         )
 
@@ -37,10 +44,31 @@ class EmbyClient:
             "X-Emby-Token": emby_auth_response.json()["AccessToken"],
             "Content-Type": "application/json",
         }
+        # Set the auth headers once; every request made through the session sends them
+        self.session.headers.update(self.headers)
+        self.session.headers['Connection'] = 'keep-alive'
 
         # self.user = self.get_user_by_username(username)
         self.user_id = self.user['Id']
 
+    def close(self):
+        self.session.close()
+
+    def get_connection_stats(self):
+        """
+        Return the number of requests sent, TCP connections opened and requests that reused a connection.
+        """
+        stats = {'requests': 0, 'connections': 0}
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                stats['requests'] += pool.num_requests
+                stats['connections'] += pool.num_connections
+        stats['reused'] = max(stats['requests'] - stats['connections'], 0)
+        return stats
+
     def _build_url(self, path, params=None):
         url = f'{self.server_url}/emby/{path}'
         if params:
@@ -50,7 +78,7 @@ class EmbyClient:
     def _get_request_with_retry(self, url, retries=6, delay=1, stream=False):
         for attempt in range(retries):
             try:
-                response = requests.get(url, headers=self.headers, timeout=61, stream=stream)
+                response = self.session.get(url, timeout=61, stream=stream)
                 response.raise_for_status()  # Raise an exception for non-1xx status codes
                 if stream is True:
                     return response
@@ -66,7 +94,7 @@ class EmbyClient:
     def _post_request_with_retry(self, url, data=None, files=None, retries=6, delay=1):
         for attempt in range(retries):
             try:
-                response = requests.post(url, data=data, files=files, headers=self.headers, timeout=61)
+                response = self.session.post(url, data=data, files=files, timeout=61)
                 response.raise_for_status()  # Raise an exception for non-1xx status codes
                 return response
             except (Timeout, requests.exceptions.RequestException, requests.exceptions.ReadTimeout) as e:
@@ -81,7 +109,7 @@ class EmbyClient:
     def _delete_request_with_retry(self, url, retries=6, delay=1):
         for attempt in range(retries):
             try:
-                response = requests.delete(url, headers=self.headers, timeout=61)
+                response = self.session.delete(url, timeout=61)
                 response.raise_for_status()  # Raise an exception for non-1xx status codes
                 return response
             except (Timeout, requests.exceptions.RequestException, requests.exceptions.ReadTimeout) as e:
@@ -162,14 +190,11 @@ class EmbyClient:
         return response.get('Items', [])
 
     def get_playlists(self):
-        url = self._build_url(f'users/{self.user_id}/items',
-                              {'Fields': 'ChildCount,RecursiveItemCount,Taglines',
-                               'Recursive': 'true',
-                               'SortBy': 'SortName',
-                               'SortOrder': 'Ascending',
-                               'IncludeItemTypes': 'playlist'})
-        response = self._get_request(url)
-        return response.get('Items', [])
+        return list(self.iter_items(fields='ChildCount,RecursiveItemCount,Taglines',
+                                    include_item_types='playlist',
+                                    recursive=True,
+                                    SortBy='SortName',
+                                    SortOrder='Ascending'))
 
     def get_tagged_playlist(self, tag):
         url = self._build_url(f'users/{self.user_id}/items',
@@ -223,6 +248,37 @@ class EmbyClient:
         # print(items, total_count)
         return items, total_count
 
+    def iter_items(self, parent_id=None, page_size=200, fields=None, include_item_types=None,
+                   recursive=False, **params):
+        """
+        Lazily page through the user's items with StartIndex/Limit, yielding each page as it arrives.
+        Extra keyword arguments are passed through as query parameters.
+        """
+        query = dict(params)
+        if parent_id is not None:
+            query['ParentId'] = parent_id
+        if fields:
+            query['Fields'] = fields
+        if include_item_types:
+            query['IncludeItemTypes'] = include_item_types
+        if recursive:
+            query['Recursive'] = 'true'
+        query['EnableTotalRecordCount'] = 'false'
+
+        start_index = 0
+        while True:
+            query['StartIndex'] = start_index
+            query['Limit'] = page_size
+            url = self._build_url(f'Users/{self.user_id}/Items', params=query)
+            response = self._get_request(url)
+            items = response.get('Items', [])
+
+            yield from items
+
+            start_index += len(items)
+            if len(items) < page_size:
+                break
+
     def get_libraries(self):
         url = self._build_url(f'Users/{self.user_id}/views')
         response = self._get_request(url)
@@ -237,16 +293,18 @@ class EmbyClient:
         libraries = self.get_libraries()
         library = next((item for item in libraries if item.get('Name') == library_name), None)
         if library:
-            return self.get_items_from_parent(library['Id'])
+            items = list(self.iter_items(
+                library['Id'],
+                fields='BasicSyncInfo,CanDelete,Container,PrimaryImageAspectRatio,ProductionYear,ExternalUrls,Status,EndDate,ProviderIds',
+                include_item_types='Movie,Series,Season,Episode',
+                recursive=True,
+                ImageTypeLimit=2))
+            return items, len(items)
         return None, 1
 
-    def get_list_items(self, list_id):
-        url = self._build_url(f'Users/{self.user_id}/Items', {
-            'ParentId': list_id,
-        })
-        response = self._get_request(url)
-        items = response.get('Items', [])
-        total_count = response.get('TotalRecordCount', 0)
+    def get_list_items(self, list_id, fields=None):
+        items = list(self.iter_items(list_id, fields=fields))
+        total_count = len(items)
         print(f'Found {total_count} items in playlist')
         return items, total_count
 
@@ -271,7 +329,7 @@ class EmbyClient:
 
     def get_collection_poster(self, collection_id):
         url = self._build_url(f'Items/{collection_id}/Images/Primary')
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url)
         return response
 
     def add_item_to_collection(self, collection_id, item_id):
@@ -284,6 +342,18 @@ class EmbyClient:
         response = self._post_request(url)
         return response
 
+    def add_items_to_playlist(self, playlist_id, item_ids, chunk_size=100):
+        """
+        Add many items to a playlist with one request per chunk of comma-separated ids.
+        """
+        item_ids = list(item_ids)
+        responses = []
+        for start in range(0, len(item_ids), chunk_size):
+            chunk = item_ids[start:start + chunk_size]
+            url = self._build_url(f'Playlists/{playlist_id}/Items', {'Ids': ','.join(chunk)})
+            responses.append(self._post_request(url))
+        return responses
+
     def delete_item_from_collection(self, collection_id, item_id):
         url = self._build_url(f'Collections/{collection_id}/Items', {'Ids': item_id})
         response = self._delete_request(url)
@@ -294,6 +364,18 @@ class EmbyClient:
         response = self._delete_request(url)
         return response
 
+    def delete_items_from_playlist(self, playlist_id, entry_ids, chunk_size=100):
+        """
+        Remove many playlist entries with one request per chunk of comma-separated entry ids.
+        """
+        entry_ids = list(entry_ids)
+        responses = []
+        for start in range(0, len(entry_ids), chunk_size):
+            chunk = entry_ids[start:start + chunk_size]
+            url = self._build_url(f'Playlists/{playlist_id}/Items', {'EntryIds': ','.join(chunk)})
+            responses.append(self._delete_request(url))
+        return responses
+
     def get_item_image(self, item_id):
         url = self._build_url(f'Items/{item_id}/Images/Primary')
         print(url)
@@ -397,11 +479,10 @@ class EmbyClient:
 
     def upload_image_data(self, id, image_data, img_type='Primary', mime_type='image/jpeg'):
         encoded_image_data = base64.b64encode(image_data)
-        headers = self.headers
-        headers['Content-Type'] = mime_type
+        headers = {'Content-Type': mime_type}
         print('Uploading image')
         url = self._build_url(f'Items/{id}/Images/{img_type}')
-        response = requests.post(url, data=encoded_image_data, headers=headers)
+        response = self.session.post(url, data=encoded_image_data, headers=headers)
         return response
 
     def get_item_metadata(self, item_id):
@@ -411,7 +492,7 @@ class EmbyClient:
 
     def update_item_metadata(self, metadata):
         url = self._build_url(f'Items/{metadata["Id"]}')
-        response = requests.post(url, json=metadata)
+        response = self.session.post(url, json=metadata)
         return response.text
 
     def get_user_by_username(self, username):
@@ -435,7 +516,7 @@ class EmbyClient:
             "X-Emby-Client-Version": Config.EMBY_VERSION
         }
 
-        response = requests.get(f"{Config.EMBY_URL}/emby/Users", headers=headers)
+        response = self.session.get(f"{Config.EMBY_URL}/emby/Users", headers=headers)
         return response.json()
 
     def search(self, query, item_type):
@@ -1,18 +1,38 @@
 import os
+from datetime import timedelta
 
 import requests
-from fuzzywuzzy import fuzz
 
 from src.config import Config
-from src.main import logger
+from src.services.catalog_cache import CatalogCache
+from src.utils.logger import get_action_logger
 from src.utils.string_utils import StringUtils
 
+logger = get_action_logger("LidarrClient")
+
 
 class LidarrClient:
     def __init__(self, url=Config.LIDARR_URL, api_key=Config.LIDARR_API_KEY):
         self.url = url
         self.api_key = api_key
         self.headers = {"X-Api-Key": self.api_key}
+        # Full /api/v1/artist payload, kept on disk and in memory between calls
+        self.catalog = CatalogCache(f"lidarr {url}", self._fetch_artists, lambda artist: [artist['artistName']],
+                                    ttl=timedelta(minutes=Config.LIDARR_CATALOG_TTL_MINUTES))
+
+    def _fetch_artists(self):
+        response = requests.get(f"{self.url}/api/v1/artist", headers=self.headers)
+        response.raise_for_status()  # Raise an exception for bad status codes
+        return response.json()
+
+    def get_existing_artist(self, foreign_artist_id):
+        """Return the Lidarr artist with this MusicBrainz artist id, or None if it isn't in Lidarr."""
+        artist = self.catalog.lookup('foreignArtistId', foreign_artist_id)
+        if artist is None:
+            # The cached catalog may predate the artist being added; confirm the miss against a fresh copy
+            self.catalog.invalidate()
+            artist = self.catalog.lookup('foreignArtistId', foreign_artist_id)
+        return artist
 
     def get_artist(self, artist_name, add_if_not_matched=False):
         search_url = f"{self.url}/api/v1/artist/lookup"
@@ -30,13 +50,7 @@ class LidarrClient:
                 )
                 if matched_artist:
                     # Check if the artist is already monitored in Lidarr
-                    get_artist_url = f"{self.url}/api/v1/artist"
-                    get_artist_response = requests.get(get_artist_url, headers=self.headers)
-                    get_artist_response.raise_for_status()
-                    existing_artists = get_artist_response.json()
-
-                    existing_artist = next((artist for artist in existing_artists if
-                                            artist['foreignArtistId'] == matched_artist['foreignArtistId']), None)
+                    existing_artist = self.get_existing_artist(matched_artist['foreignArtistId'])
 
                     if existing_artist:
                         return existing_artist
@@ -65,6 +79,7 @@ class LidarrClient:
                             }
                             add_response = requests.post(add_url, json=add_data, headers=self.headers)
                             add_response.raise_for_status()
+                            self.catalog.invalidate()
                             return add_response.json()
                         else:
                             return None
@@ -76,12 +91,8 @@ class LidarrClient:
 
     def get_artists(self):
         """Fetch all artists from Lidarr."""
-        url = f"{Config.LIDARR_URL}/api/v1/artist"
-
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            artists = response.json()
+            artists = self.catalog.get()
 
             # Extract artist names from the response
             artist_names = [artist['artistName'] for artist in artists]
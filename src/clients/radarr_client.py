@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 import requests
 from src.config import Config
+from src.services.catalog_cache import CatalogCache
 from src.utils.logger import get_action_logger
 
 
@@ -9,46 +12,41 @@ class RadarrClient:
         self.api_key = api_key
         self.headers = {"X-Api-Key": self.api_key}
         self.logger = logger
+        # Full /movie payload, kept on disk and in memory between calls
+        self.catalog = CatalogCache(f"radarr {url}", self._fetch_movies, self._movie_titles,
+                                    ttl=timedelta(minutes=Config.RADARR_CATALOG_TTL_MINUTES))
 
     def rescan_movie(self, movie_id):
         """Trigger a rescan of the movie in Radarr."""
         payload = {'name': 'RescanMovie', 'movieId': movie_id}
         response = requests.post(f'{self.url}/command', json=payload, headers=self.headers)
         response.raise_for_status()
+        self.catalog.invalidate()
         return response.json()
 
+    def _fetch_movies(self):
+        self.logger.info("Fetching all movies from Radarr...")
+        response = requests.get(f'{self.url}/movie', headers=self.headers)
+        response.raise_for_status()
+        movies = response.json()
+        self.logger.info(f"Successfully fetched {len(movies)} movies from Radarr.")
+        return movies
+
+    @staticmethod
+    def _movie_titles(movie):
+        return [movie['title']] + [alt_title['title'] for alt_title in movie.get('alternativeTitles', [])]
+
     def get_all_movies(self):
         """
         Get a list of all movies in Radarr, including alternative titles.
-        Returns a dictionary with all possible titles (main and alternatives) for each movie.
+        Returns a dictionary with all possible titles (main and alternatives, lowercased) for each movie.
         """
-        self.logger.info("Fetching all movies from Radarr...")
-
         try:
-            response = requests.get(f'{self.url}/movie', headers=self.headers)
-            response.raise_for_status()
-            movies = response.json()
-            self.logger.info(f"Successfully fetched {len(movies)} movies from Radarr.")
+            all_titles = self.catalog.by_title()
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to fetch movies from Radarr: {str(e)}")
             return {}
 
-        all_titles = {}
-        alt_title_count = 0
-
-        for movie in movies:
-            main_title = movie['title'].lower()
-            all_titles[main_title] = movie
-            self.logger.debug(f"Added main title: '{movie['title']}'")
-
-            for alt_title in movie.get('alternativeTitles', []):
-                alt_title_lower = alt_title['title'].lower()
-                if alt_title_lower != main_title:
-                    all_titles[alt_title_lower] = movie
-                    alt_title_count += 1
-                    self.logger.debug(f"Added alternative title for '{movie['title']}': '{alt_title['title']}'")
-
-        self.logger.info(f"Processed {len(movies)} movies with {alt_title_count} alternative titles.")
         self.logger.info(f"Total unique titles (including alternatives): {len(all_titles)}")
 
         # Print out some sample entries for verification
@@ -86,6 +84,7 @@ class RadarrClient:
         }
         response = requests.post(f'{self.url}/movie', json=payload, headers=self.headers)
         response.raise_for_status()
+        self.catalog.invalidate()
         return response.json()
 
     def get_quality_profiles(self):
@@ -1,6 +1,9 @@
 
+from datetime import timedelta
+
 import requests
 from src.config import Config
+from src.services.catalog_cache import CatalogCache
 from src.utils.logger import get_action_logger
 
 
@@ -10,46 +13,41 @@ class SonarrClient:
         self.api_key = api_key
         self.headers = {"X-Api-Key": self.api_key}
         self.logger = logger
+        # Full /series payload, kept on disk and in memory between calls
+        self.catalog = CatalogCache(f"sonarr {url}", self._fetch_series, self._series_titles,
+                                    ttl=timedelta(minutes=Config.SONARR_CATALOG_TTL_MINUTES))
 
     def rescan_series(self, show_id):
         """Trigger a rescan of the series in Sonarr."""
         payload = {'name': 'RescanSeries', 'seriesId': show_id}
         response = requests.post(f'{self.url}/command', json=payload, headers=self.headers)
         response.raise_for_status()
+        self.catalog.invalidate()
         return response.json()
 
+    def _fetch_series(self):
+        self.logger.info("Fetching all shows from Sonarr...")
+        response = requests.get(f'{self.url}/series', headers=self.headers)
+        response.raise_for_status()
+        shows = response.json()
+        self.logger.info(f"Successfully fetched {len(shows)} shows from Sonarr.")
+        return shows
+
+    @staticmethod
+    def _series_titles(show):
+        return [show['title']] + [alt_title['title'] for alt_title in show.get('alternateTitles', [])]
+
     def get_all_shows(self):
         """
         Get a list of all TV shows in Sonarr, including alternative titles.
-        Returns a dictionary with all possible titles (main and alternatives) for each show.
+        Returns a dictionary with all possible titles (main and alternatives, lowercased) for each show.
         """
-        self.logger.info("Fetching all shows from Sonarr...")
-
         try:
-            response = requests.get(f'{self.url}/series', headers=self.headers)
-            response.raise_for_status()
-            shows = response.json()
-            self.logger.info(f"Successfully fetched {len(shows)} shows from Sonarr.")
+            all_titles = self.catalog.by_title()
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to fetch shows from Sonarr: {str(e)}")
             return {}
 
-        all_titles = {}
-        alt_title_count = 0
-
-        for show in shows:
-            main_title = show['title'].lower()
-            all_titles[main_title] = show
-            self.logger.debug(f"Added main title: '{show['title']}'")
-
-            for alt_title in show.get('alternateTitles', []):
-                alt_title_lower = alt_title['title'].lower()
-                if alt_title_lower != main_title:
-                    all_titles[alt_title_lower] = show
-                    alt_title_count += 1
-                    self.logger.debug(f"Added alternative title for '{show['title']}': '{alt_title['title']}'")
-
-        self.logger.info(f"Processed {len(shows)} shows with {alt_title_count} alternative titles.")
         self.logger.info(f"Total unique titles (including alternatives): {len(all_titles)}")
 
         # Print out some sample entries for verification
@@ -1,17 +1,49 @@
 import os
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import requests
 import spotipy
 from fuzzywuzzy import fuzz
-from spotipy import SpotifyOAuth, CacheFileHandler
+from rapidfuzz import fuzz as rapid_fuzz, process
+from spotipy import SpotifyOAuth, CacheFileHandler, SpotifyException
+from src.config import Config
 from src.utils.logger import setup_logger
 from src.utils.string_utils import StringUtils
+from src.utils.title_normalizer import clean_title, remove_parentheses
 
 logger = setup_logger()
 
+# Only the parts of a playlist item the syncs use: name, artists, album, ISRC and id
+PLAYLIST_TRACK_FIELDS = "total,items(added_at,track(id,name,artists(name),album(name),external_ids(isrc)))"
+
+
+class RateLimiter:
+    """
+    Spaces calls at least 1/rate seconds apart, shared by all threads using it.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.lock = threading.Lock()
+        self.next_call_time = 0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            call_time = max(now, self.next_call_time)
+            self.next_call_time = call_time + self.interval
+        if call_time > now:
+            time.sleep(call_time - now)
+
 
 class SpotifyClient:
-    def __init__(self, client_id, client_secret, redirect_uri, scope, config_root="/app/config/"):
+    def __init__(self, client_id, client_secret, redirect_uri, scope, config_root="/app/config/",
+                 max_workers=Config.SPOTIFY_MAX_WORKERS, requests_per_second=Config.SPOTIFY_REQUESTS_PER_SECOND):
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
         # Authenticate with Spotify API
         self.sp = spotipy.Spotify(
             auth_manager=SpotifyOAuth(
@@ -91,13 +123,129 @@ class SpotifyClient:
             logger.error(f"Error matching song: {str(e)}")
             return False
 
-    def get_playlist_tracks(self, playlist_id):
-        results = self.sp.playlist_tracks(playlist_id)
-        tracks = results["items"]
-        while results["next"]:
-            results = self.sp.next(results)
-            tracks.extend(results["items"])
-        return tracks
+    def match_songs(self, spotify_song, emby_songs):
+        """
+        Batch version of match_song: score one Spotify song against many Emby songs at once.
+        Returns (index, combined_score) of the first accepted candidate, or (None, 0).
+        """
+        try:
+            emby_songs = list(emby_songs)
+            if not emby_songs:
+                return None, 0
+
+            spotify_titles = _title_variants(spotify_song.get("name") or "")
+            spotify_artists = [StringUtils.clean_string(artist.get("name", "").lower())
+                               for artist in spotify_song["artists"]]
+
+            emby_titles = [_title_variants(emby_song.get("Name") or "") for emby_song in emby_songs]
+            title_scores = np.zeros(len(emby_songs))
+            for variant, spotify_title in enumerate(spotify_titles):
+                candidates = [titles[variant] for titles in emby_titles]
+                title_scores = np.maximum(title_scores, _ratios([spotify_title], candidates)[0])
+
+            emby_artists = []
+            owners = []
+            for index, emby_song in enumerate(emby_songs):
+                for artist in emby_song.get("Artists") or []:
+                    emby_artists.append(StringUtils.clean_string(artist.lower()))
+                    owners.append(index)
+
+            artist_scores = np.zeros(len(emby_songs))
+            if spotify_artists and emby_artists:
+                best_per_artist = _ratios(spotify_artists, emby_artists).max(axis=0)
+                np.maximum.at(artist_scores, np.array(owners), best_per_artist)
+
+            combined_scores = title_scores + artist_scores
+            accepted = np.flatnonzero((title_scores >= 85) & (artist_scores >= 75) & (combined_scores >= 165))
+            if accepted.size:
+                index = int(accepted[0])
+                return index, int(combined_scores[index])
+            return None, 0
+        except Exception as e:
+            logger.error(f"Error matching song: {str(e)}")
+            return None, 0
+
+    def _call_with_retry(self, func, *args, retries=5, **kwargs):
+        """
+        Call a spotipy method, waiting out 429 responses for as long as Spotify's Retry-After asks.
+        """
+        for attempt in range(retries):
+            self.rate_limiter.wait()
+            try:
+                return func(*args, **kwargs)
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == retries - 1:
+                    raise
+                retry_after = int((e.headers or {}).get("Retry-After", 1))
+                logger.warning(f"Spotify rate limit hit, retrying in {retry_after} seconds")
+                time.sleep(retry_after)
+
+    def _submit_remaining_pages(self, executor, fetch_page, limit, first_page):
+        """
+        Submit the offsets after first_page to executor. Returns the futures in offset order.
+        """
+        offsets = range(len(first_page["items"]), first_page.get("total") or 0, limit) \
+            if first_page["items"] else []
+        return [executor.submit(self._call_with_retry, fetch_page, limit=limit, offset=offset) for offset in offsets]
+
+    def _get_all_pages(self, fetch_page, limit):
+        """
+        Fetch the first page to learn the total, then the remaining offsets concurrently.
+        fetch_page(limit=, offset=) must return a paging object; items come back in order.
+        """
+        first_page = self._call_with_retry(fetch_page, limit=limit, offset=0)
+        items = list(first_page["items"])
+        if not items or len(items) >= (first_page.get("total") or 0):
+            return items
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for future in self._submit_remaining_pages(executor, fetch_page, limit, first_page):
+                items.extend(future.result()["items"])
+        return items
+
+    def _playlist_page_fetcher(self, playlist_id, fields=PLAYLIST_TRACK_FIELDS):
+        def fetch_page(limit, offset):
+            return self.sp.playlist_items(playlist_id, fields=fields, limit=limit, offset=offset,
+                                          additional_types=("track",))
+
+        return fetch_page
+
+    def get_playlist_tracks(self, playlist_id, fields=PLAYLIST_TRACK_FIELDS):
+        return self._get_all_pages(self._playlist_page_fetcher(playlist_id, fields), limit=100)
+
+    def get_playlists_tracks(self, playlist_ids, limit=100):
+        """
+        Fetch the tracks of many playlists on one bounded worker pool: the first page of every
+        playlist, then each playlist's remaining pages as soon as its total is known.
+        Returns {playlist_id: tracks}; playlists that fail to load are logged and left out.
+        """
+        playlist_ids = list(dict.fromkeys(playlist_ids))
+        fetchers = {playlist_id: self._playlist_page_fetcher(playlist_id) for playlist_id in playlist_ids}
+        manifest = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            first_pages = {playlist_id: executor.submit(self._call_with_retry, fetch_page, limit=limit, offset=0)
+                           for playlist_id, fetch_page in fetchers.items()}
+
+            pages = {}
+            for playlist_id, future in first_pages.items():
+                try:
+                    first_page = future.result()
+                except (SpotifyException, requests.exceptions.RequestException) as e:
+                    logger.error(f"Error fetching tracks for Spotify playlist {playlist_id}: {str(e)}")
+                    continue
+                pages[playlist_id] = (first_page["items"], self._submit_remaining_pages(
+                    executor, fetchers[playlist_id], limit, first_page))
+
+            for playlist_id, (items, futures) in pages.items():
+                try:
+                    manifest[playlist_id] = list(items) + [item for future in futures
+                                                           for item in future.result()["items"]]
+                except (SpotifyException, requests.exceptions.RequestException) as e:
+                    logger.error(f"Error fetching tracks for Spotify playlist {playlist_id}: {str(e)}")
+
+        logger.info(f"Fetched tracks for {len(manifest)}/{len(playlist_ids)} Spotify playlists")
+        return manifest
 
     def get_playlists(self):
         return self.sp.current_user_playlists()
@@ -117,12 +265,23 @@ class SpotifyClient:
 
 
     def get_liked_songs(self):
+        return self._get_all_pages(self.sp.current_user_saved_tracks, limit=50)
+
+    def get_liked_songs_since(self, added_after, limit=50):
+        """
+        Liked songs come back newest first, so read pages only until reaching one liked at or before added_after.
+        """
         liked_songs = []
-        results = self.sp.current_user_saved_tracks()
-        while results:
-            liked_songs.extend(results["items"])
-            results = self.sp.next(results)
-        return liked_songs
+        offset = 0
+        while True:
+            results = self._call_with_retry(self.sp.current_user_saved_tracks, limit=limit, offset=offset)
+            for item in results["items"]:
+                if item["added_at"] <= added_after:
+                    return liked_songs
+                liked_songs.append(item)
+            if not results["next"]:
+                return liked_songs
+            offset += limit
 
     def get_featured_playlists(self):
         return self.sp.featured_playlists()["playlists"]
@@ -133,21 +292,44 @@ class SpotifyClient:
     def get_categorys(self):
         return self.sp.categories(country="US")["categories"]
 
-    def get_category_by_name(self, name):
-        for category in self.sp.categories(country="US")["categories"]["items"]:
+    def get_category_by_name(self, name, categories=None):
+        if categories is None:
+            categories = self.sp.categories(country="US")["categories"]["items"]
+        for category in categories:
             logger.info(f"Checking category: {category['name']} == {name}")
             if category["name"].lower() == name.lower():
                 logger.info(f"Found category: {category['name']}")
                 return category
         return None
 
-    def get_category_playlists_by_name(self, name):
-        category = self.get_category_by_name(name)
+    def get_category_playlists_by_name(self, name, categories=None):
+        category = self.get_category_by_name(name, categories)
         if category:
             logger.info(f"Getting playlists from category: {category['name']}")
-            return self.sp.category_playlists(category["id"])["playlists"]
+            return self._call_with_retry(self.sp.category_playlists, category["id"])["playlists"]
         return None
 
+    def get_categories_playlists(self, names):
+        """
+        Fetch the playlists of several categories concurrently, listing the categories only once.
+        Returns the playlists of all found categories, in the order of names.
+        """
+        categories = self._call_with_retry(self.sp.categories, country="US", limit=50)["categories"]["items"]
+
+        def fetch(name):
+            try:
+                return self.get_category_playlists_by_name(name, categories)
+            except (SpotifyException, requests.exceptions.RequestException) as e:
+                logger.error(f"Error fetching playlists from category {name}: {str(e)}")
+                return None
+
+        playlists = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for category_playlists in executor.map(fetch, names):
+                if category_playlists:
+                    playlists += category_playlists["items"]
+        return playlists
+
 
     def get_made_for_you(self):
         # get the category id for made for you
@@ -166,70 +348,16 @@ class SpotifyClient:
         return playlists
 
 
-def remove_parentheses(text):
-    if text:
-        return re.sub(r'\([^)]*\)', '', text).strip()
-    else:
-        return text
-
-def clean_title(title):
-    # Convert to lowercase
-    title = title.lower()
-
-    # logging.info(f"Current title: {title}")
-
-    # Remove text after featuring, feat, ft, etc.
-    patterns = [
-        r'\(feat\..*?\)',
-        r'\(ft\..*?\)',
-        r'\(featuring.*?\)',
-        r'feat\..*',
-        r'ft\..*',
-        r'featuring.*',
-        r'\(with.*?\)',
-        r'\(prod\..*?\)',
-        r'\(produced by.*?\)',
-        r'- radio edit',
-        r'- single version',
-        r'- album version',
-        r'\(remaster(ed)?\)',
-        r'- remaster(ed)?',
-        r'\(remix\)',
-        r'- remix',
-        r'\(live\)',
-        r'- live',
-        r'\(acoustic\)',
-        r'- acoustic',
-        r'\(deluxe\)',
-        r'- deluxe',
-        r'\(extended\)',
-        r'- extended',
-        r'\(original mix\)',
-        r'- original mix',
-        r'\(album version\)',
-        r'- album version',
-        r'\(explicit\)',
-        r'- explicit',
-        r'\(clean\)',
-        r'- clean',
-        r'\d{4} (remaster|version)',
-        r'\d{4} digital (remaster|version)',
-    ]
-
-    for pattern in patterns:
-        title = re.sub(pattern, '', title, flags=re.IGNORECASE)
-
-    # Remove any remaining parentheses and their contents
-    title = re.sub(r'\([^)]*\)', '', title)
-
-    # Remove common filler words
-    # filler_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'by']
-    title_words = title.split()
-    # title_words = [word for word in title_words if word.lower() not in filler_words]
-    title = ' '.join(title_words)
-
-    # Remove any extra whitespace
-    title = ' '.join(title.split())
-
-    # logging.info(f"Cleaned Title: {title}")
-    return title.strip()
+def _title_variants(title):
+    """
+    The three title forms match_song compares: cleaned, without parentheses, and clean_title'd.
+    """
+    title = StringUtils.clean_string(title.lower())
+    return title, remove_parentheses(title), clean_title(title)
+
+
+def _ratios(queries, choices):
+    """
+    Pairwise fuzz.ratio matrix, rounded to integers the way fuzzywuzzy reports them.
+    """
+    return np.rint(process.cdist(queries, choices, scorer=rapid_fuzz.ratio))
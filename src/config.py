@@ -7,8 +7,8 @@ import os
 # Get the directory of the current script
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Construct the path to settings.yml (assuming it's in the parent directory)
-settings_path = os.path.join(current_dir, '..', 'config', 'settings.yml')
+# Construct the path to settings.yml (assuming it's in the parent directory), unless SETTINGS_PATH points elsewhere
+settings_path = os.environ.get('SETTINGS_PATH', os.path.join(current_dir, '..', 'config', 'settings.yml'))
 
 # Load the YAML file
 with open(settings_path, 'r') as file:
@@ -27,11 +27,17 @@ class Config:
     LIDARR_METADATA_PROFILE_ID = settings['lidarr']['metadata_profile_id']
     DRY_RUN = settings.get('dry_run', False)
 
+    # Playlist sync settings ('incremental' applies only the changes, 'rebuild' deletes and recreates)
+    PLAYLIST_SYNC_MODE = settings.get('playlist_sync', {}).get('mode', 'incremental')
+    LIKED_FULL_SYNC_DAYS = settings.get('playlist_sync', {}).get('liked_full_sync_days', 7)
+
     # Spotify API credentials
     SPOTIFY_CLIENT_ID = settings['spotify']['client_id']
     SPOTIFY_CLIENT_SECRET = settings['spotify']['client_secret']
     SPOTIFY_REDIRECT_URI = settings['spotify']['redirect_uri']
     SPOTIFY_SCOPE = settings['spotify']['scope']
+    SPOTIFY_MAX_WORKERS = settings['spotify'].get('max_workers', 4)
+    SPOTIFY_REQUESTS_PER_SECOND = settings['spotify'].get('requests_per_second', 10)
 
     # Emby API credentials
     EMBY_URL = settings['emby']['url']
@@ -43,20 +49,25 @@ class Config:
     EMBY_DEVICE = settings['emby']['device']
     EMBY_DEVICE_ID = settings['emby']['device_id']
     EMBY_VERSION = settings['emby']['version']
+    EMBY_POOL_SIZE = settings['emby'].get('pool_size', 10)
+    EMBY_MAX_CONCURRENCY = settings['emby'].get('max_concurrency', 8)
 
     # Sonarr settings
     SONARR_API_KEY = settings['sonarr']['api_key']
     SONARR_URL = settings['sonarr']['url']
     SONARR_MATCH_THRESHOLD = settings['sonarr']['match_threshold']
+    SONARR_CATALOG_TTL_MINUTES = settings['sonarr'].get('catalog_ttl_minutes', 60)
 
     # Radarr settings
     RADARR_API_KEY = settings['radarr']['api_key']
     RADARR_URL = settings['radarr']['url']
     RADARR_MATCH_THRESHOLD = settings['radarr']['match_threshold']
+    RADARR_CATALOG_TTL_MINUTES = settings['radarr'].get('catalog_ttl_minutes', 60)
 
     LIDARR_API_KEY = settings['lidarr']['api_key']
     LIDARR_URL = settings['lidarr']['url']
     LIDARR_MATCH_THRESHOLD = settings['lidarr']['match_threshold']
+    LIDARR_CATALOG_TTL_MINUTES = settings['lidarr'].get('catalog_ttl_minutes', 60)
 
     # Navidrome settings
     NAVIDROME_URL = settings['navidrome']['url']
@@ -70,6 +81,10 @@ class Config:
 
     MUSIC_SPOTIFY_DOWNLOAD_DIR = settings['music']['spotify_download_dir']
     MUSIC_SPOTIFY_ORGANIZED_DIR = settings['music']['spotify_organized_dir']
+    MUSIC_SPOTDL_ENGINE = settings['music'].get('spotdl_engine', 'subprocess')
+    MUSIC_SPOTDL_CONCURRENCY = settings['music'].get('spotdl_concurrency', 3)
+    MUSIC_SPOTDL_TIMEOUT = settings['music'].get('spotdl_timeout', 600)
+    MUSIC_TAG_READ_WORKERS = settings['music'].get('tag_read_workers', 16)
 
     MUSIC_DOWNLOAD_DIR = settings['music']['download_dir']
     MUSIC_ORGANIZED_DIR = settings['music']['organized_dir']
@@ -19,12 +19,13 @@ def mesh_shows(emby_client):
 
     playlist = emby_client.create_playlist("Meshed Shows", EmbyLibraryItemType.VIDEO.value)
     playlist_id = playlist["Id"]
+    episode_ids = []
 
     for i in range(max_episodes):
         for j, episodes in enumerate(all_episodes):
             if i < len(episodes):
                 episode = episodes[i]
-                emby_client.add_item_to_playlist(playlist_id, episode["Id"])
+                episode_ids.append(episode["Id"])
                 print(f"Adding {shows[j]['name']} S{episode['ParentIndexNumber']:02}E{episode['IndexNumber']:02} to the playlist")
 
                 # Balance the shows based on the number of episodes
@@ -36,9 +37,10 @@ def mesh_shows(emby_client):
                     for k in range(extra_episodes):
                         if i + k + 1 < len(episodes):
                             extra_episode = episodes[i + k + 1]
-                            emby_client.add_item_to_playlist(playlist_id, extra_episode["Id"])
+                            episode_ids.append(extra_episode["Id"])
                             print(f"Adding {shows[j]['name']} S{extra_episode['ParentIndexNumber']:02}E{extra_episode['IndexNumber']:02} to the playlist")
 
+    emby_client.add_items_to_playlist(playlist_id, episode_ids)
     print("Playlist created successfully!")
 
 def main():
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime, timedelta
+
+from src.clients.db_client import get_database
+from src.config import Config
+from src.utils.logger import get_action_logger
+
+logger = get_action_logger("catalog_cache")
+
+
+class CatalogCache:
+    """
+    Keeps a full *arr catalog (the /series, /movie or /artist payload) in the state database and
+    in memory, so it is downloaded once per ttl instead of on every call. Clients call
+    invalidate() after commands that change the catalog.
+
+    fetch() returns the list of items; titles(item) returns the names an item can be looked up by.
+    """
+
+    def __init__(self, name, fetch, titles, ttl=timedelta(minutes=60), db_path=Config.DATABASE_FILE_PATH):
+        self.name = name
+        self.fetch = fetch
+        self.titles = titles
+        self.ttl = ttl
+        self.db_path = db_path
+        self._items = None
+        self._fetched_at = None
+        self._indexes = {}
+        self._by_title = None
+
+    @staticmethod
+    def normalize_title(title):
+        return title.lower()
+
+    def get(self):
+        """
+        Return the catalog items, from memory or disk while fresh, otherwise fetched again.
+        Errors from fetch() are raised to the caller.
+        """
+        now = datetime.now()
+        if self._items is not None and now - self._fetched_at < self.ttl:
+            return self._items
+
+        db = get_database(self.db_path)
+        row = db.fetch_one('SELECT fetched_at, payload FROM arr_catalogs WHERE name = ?', (self.name,))
+        if row is not None and now - datetime.fromisoformat(row[0]) < self.ttl:
+            logger.debug(f"Using the {self.name} catalog cached at {row[0]}")
+            self._set_items(json.loads(row[1]), datetime.fromisoformat(row[0]))
+            return self._items
+
+        items = self.fetch()
+        db.execute_query('INSERT OR REPLACE INTO arr_catalogs VALUES (?, ?, ?)',
+                         (self.name, now.isoformat(), json.dumps(items)))
+        self._set_items(items, now)
+        return self._items
+
+    def _set_items(self, items, fetched_at):
+        self._items = items
+        self._fetched_at = fetched_at
+        self._indexes = {}
+        self._by_title = None
+
+    def invalidate(self):
+        logger.debug(f"Invalidating the {self.name} catalog")
+        self._set_items(None, None)
+        get_database(self.db_path).execute_query('DELETE FROM arr_catalogs WHERE name = ?', (self.name,))
+
+    def lookup(self, field, value):
+        """
+        Return the item whose field equals value, e.g. lookup('id', 12), or None.
+        """
+        items = self.get()
+        index = self._indexes.get(field)
+        if index is None:
+            index = self._indexes[field] = {item.get(field): item for item in items}
+        return index.get(value)
+
+    def by_title(self):
+        """
+        Return {normalized title: item} over every title of every item.
+        """
+        items = self.get()
+        if self._by_title is None:
+            self._by_title = {}
+            for item in items:
+                for title in self.titles(item):
+                    self._by_title.setdefault(self.normalize_title(title), item)
+        return self._by_title
+
+    def lookup_title(self, title):
+        return self.by_title().get(self.normalize_title(title))
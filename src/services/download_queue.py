@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from src.clients.db_client import get_database
+from src.config import Config
+from src.utils.logger import get_action_logger
+
+logger = get_action_logger("download_queue")
+
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class DownloadQueue:
+    """
+    Durable queue of songs to download, one row per (track, artist, album).
+    Jobs are claimed highest priority first; a failed job is retried later with exponential
+    backoff and given up on after max_attempts.
+    """
+
+    def __init__(self, db_path=Config.DATABASE_FILE_PATH, max_attempts=5, retry_delay=timedelta(days=1)):
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.db = get_database(db_path)
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, songs, priority=0):
+        """
+        Add (playlist_name, track_name, artist_name, album_name) rows. Songs already queued keep
+        their state, and are only bumped to the higher priority.
+        """
+        now = datetime.now().isoformat()
+        self.db.executemany('''INSERT INTO download_queue
+                               (playlist_name, track_name, artist_name, album_name, priority, updated_at)
+                               VALUES (?, ?, ?, COALESCE(?, ''), ?, ?)
+                               ON CONFLICT (track_name, artist_name, album_name)
+                               DO UPDATE SET priority = MAX(priority, excluded.priority)''',
+                            [(playlist_name, track_name, artist_name, album_name, priority, now)
+                             for playlist_name, track_name, artist_name, album_name in songs
+                             if track_name and artist_name])
+
+    def requeue_stale(self):
+        """
+        Put jobs left in progress by an interrupted run back in the queue.
+        """
+        cursor = self.db.execute_query('UPDATE download_queue SET status = ? WHERE status = ?', (PENDING, IN_PROGRESS))
+        return cursor.rowcount
+
+    def claim(self, limit):
+        """
+        Mark up to limit due jobs in progress and return them as (track_name, artist_name, album_name).
+        """
+        now = datetime.now().isoformat()
+        # Taking the write lock up front means two workers can't claim the same rows
+        with self.db.transaction(immediate=True) as conn:
+            rows = conn.execute('''SELECT id, track_name, artist_name, album_name FROM download_queue
+                                   WHERE status = ? AND next_retry_at <= ?
+                                   ORDER BY priority DESC, id
+                                   LIMIT ?''', (PENDING, now, limit)).fetchall()
+            conn.executemany('UPDATE download_queue SET status = ?, updated_at = ? WHERE id = ?',
+                             [(IN_PROGRESS, now, row[0]) for row in rows])
+        return [row[1:] for row in rows]
+
+    def mark_done(self, song):
+        self.db.execute_query('''UPDATE download_queue SET status = ?, last_error = NULL, updated_at = ?
+                                 WHERE track_name = ? AND artist_name = ? AND album_name = ?''',
+                              (DONE, datetime.now().isoformat(), *song))
+
+    def mark_failed(self, song, error=None):
+        """
+        Record a failed attempt: retry after retry_delay * 2^(attempts - 1), or give up after max_attempts.
+        """
+        now = datetime.now()
+        with self.db.transaction(immediate=True) as conn:
+            row = conn.execute('''SELECT attempts FROM download_queue
+                                  WHERE track_name = ? AND artist_name = ? AND album_name = ?''', song).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            status = FAILED if attempts >= self.max_attempts else PENDING
+            next_retry_at = (now + self.retry_delay * 2 ** (attempts - 1)).isoformat()
+            conn.execute('''UPDATE download_queue
+                            SET status = ?, attempts = ?, next_retry_at = ?, last_error = ?, updated_at = ?
+                            WHERE track_name = ? AND artist_name = ? AND album_name = ?''',
+                         (status, attempts, next_retry_at, error, now.isoformat(), *song))
+
+    def counts(self):
+        return dict(self.db.fetch_all('SELECT status, COUNT(*) FROM download_queue GROUP BY status'))
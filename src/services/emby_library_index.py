@@ -0,0 +1,127 @@
+from collections import defaultdict
+
+from src.clients.spotify_client import clean_title
+from src.utils.logger import get_action_logger
+from src.utils.string_utils import StringUtils
+
+logger = get_action_logger("emby_library_index")
+
+# ProviderIds keys (lowercased) Emby uses for the MusicBrainz recording a track was tagged with
+MUSICBRAINZ_RECORDING_KEYS = ('musicbrainztrack', 'musicbrainzrecording')
+
+
+def normalize_title(title):
+    """
+    Build the lookup key for a track title: featuring/remaster noise removed,
+    punctuation stripped, lowercased and whitespace collapsed.
+    """
+    if not title:
+        return ""
+    return ' '.join(StringUtils.clean_string(clean_title(title)).split())
+
+
+def normalize_artist(artist):
+    """
+    Build the lookup key for an artist name.
+    """
+    if not artist:
+        return ""
+    return ' '.join(StringUtils.clean_string(artist).split())
+
+
+def normalize_isrc(isrc):
+    """
+    ISRCs are sometimes tagged with hyphens or in lowercase; compare them bare and uppercased.
+    """
+    if not isrc:
+        return ""
+    return isrc.replace('-', '').replace(' ', '').upper()
+
+
+class EmbyLibraryIndex:
+    """
+    In-memory index of every Audio item in Emby, so tracks can be matched
+    locally instead of with one search request per track.
+    """
+
+    def __init__(self, items=None):
+        self.items_by_id = {}
+        self.by_title = defaultdict(list)
+        self.by_artist = defaultdict(list)
+        self.by_isrc = {}
+        self.by_musicbrainz_id = {}
+
+        for item in items or []:
+            self.add(item)
+
+    @classmethod
+    def build(cls, emby, page_size=1000):
+        """
+        Stream all Audio items from Emby page by page and index them.
+        """
+        index = cls()
+        for item in emby.iter_items(page_size=page_size, fields='Artists,ProviderIds',
+                                    include_item_types='Audio', recursive=True,
+                                    ExcludeItemTypes='Podcast', EnableImages='false',
+                                    SortBy='SortName', SortOrder='Ascending'):
+            index.add(item)
+
+        logger.info(f"Built Emby library index with {len(index)} audio items")
+        return index
+
+    def add(self, item):
+        item_id = item.get('Id')
+        if not item_id or item_id in self.items_by_id:
+            return
+
+        self.items_by_id[item_id] = item
+
+        title_key = normalize_title(item.get('Name'))
+        if title_key:
+            self.by_title[title_key].append(item)
+
+        for artist in item.get('Artists') or []:
+            artist_key = normalize_artist(artist)
+            if artist_key:
+                self.by_artist[artist_key].append(item)
+
+        provider_ids = {key.lower(): value for key, value in (item.get('ProviderIds') or {}).items()}
+        isrc = normalize_isrc(provider_ids.get('isrc'))
+        if isrc:
+            self.by_isrc.setdefault(isrc, item)
+        for key in MUSICBRAINZ_RECORDING_KEYS:
+            if provider_ids.get(key):
+                self.by_musicbrainz_id.setdefault(provider_ids[key].lower(), item)
+
+    def get(self, item_id):
+        return self.items_by_id.get(item_id)
+
+    def __contains__(self, item_id):
+        return item_id in self.items_by_id
+
+    def __len__(self):
+        return len(self.items_by_id)
+
+    def find_by_ids(self, isrc=None, musicbrainz_id=None):
+        """
+        Exact lookup by ISRC or MusicBrainz recording id, or None if neither is indexed.
+        """
+        if musicbrainz_id and musicbrainz_id.lower() in self.by_musicbrainz_id:
+            return self.by_musicbrainz_id[musicbrainz_id.lower()]
+        return self.by_isrc.get(normalize_isrc(isrc))
+
+    def find_candidates(self, track_name, artist_name):
+        """
+        Return the indexed items worth scoring against a track: items with the
+        same normalized title first, then the rest of the artist's tracks.
+        """
+        candidates = []
+        seen = set()
+
+        for item in self.by_title.get(normalize_title(track_name), []) + \
+                self.by_artist.get(normalize_artist(artist_name), []):
+            if item['Id'] not in seen:
+                seen.add(item['Id'])
+                candidates.append(item)
+
+        return candidates
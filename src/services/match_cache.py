@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from src.clients.db_client import get_database
+from src.config import Config
+from src.utils.logger import get_action_logger
+
+logger = get_action_logger("match_cache")
+
+
+class MatchCache:
+    """
+    Remembers which Emby item each Spotify track id resolved to, so a track that shows up
+    in many playlists (or on every run) is matched once and then looked up by primary key.
+    """
+
+    def __init__(self, db_path=Config.DATABASE_FILE_PATH):
+        self.db = get_database(db_path)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, spotify_track_id, library_index=None):
+        """
+        Return the cached Emby item id for a Spotify track, or None.
+        With a library index, an entry whose Emby item is gone is dropped and treated as a miss.
+        """
+        if not spotify_track_id:
+            return None
+
+        row = self.db.fetch_one("SELECT emby_item_id FROM spotify_emby_matches WHERE spotify_track_id = ?",
+                                (spotify_track_id,))
+        if row is None:
+            self.misses += 1
+            return None
+
+        emby_item_id = row[0]
+        if library_index is not None and emby_item_id not in library_index:
+            logger.info(f"Emby item {emby_item_id} no longer exists, dropping cached match for {spotify_track_id}")
+            self.invalidate(spotify_track_id)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return emby_item_id
+
+    def set(self, spotify_track_id, emby_item_id, score):
+        if not spotify_track_id or not emby_item_id:
+            return
+        self.db.execute_query("INSERT OR REPLACE INTO spotify_emby_matches VALUES (?, ?, ?, ?)",
+                              (spotify_track_id, emby_item_id, score, datetime.now().isoformat()))
+
+    def invalidate(self, spotify_track_id):
+        self.db.execute_query("DELETE FROM spotify_emby_matches WHERE spotify_track_id = ?", (spotify_track_id,))
+
@@ -1,5 +1,50 @@
 from src.clients.emby_client import EmbyClient
 
+
+def diff_playlist_items(current_entries, desired_item_ids):
+    """
+    Compare the current entries of a playlist with the desired list of item ids.
+    Returns the item ids to add and the playlist entry ids to remove; repeated
+    entries of the same item beyond the first are removed as well.
+    """
+    desired = set(desired_item_ids)
+    kept = set()
+    entry_ids_to_remove = []
+
+    for entry in current_entries:
+        item_id = entry["Id"]
+        if item_id in desired and item_id not in kept:
+            kept.add(item_id)
+        else:
+            entry_ids_to_remove.append(entry["PlaylistItemId"])
+
+    item_ids_to_add = []
+    for item_id in desired_item_ids:
+        if item_id not in kept:
+            kept.add(item_id)
+            item_ids_to_add.append(item_id)
+
+    return item_ids_to_add, entry_ids_to_remove
+
+
+def sync_playlist_items(emby: EmbyClient, playlist_id: str, desired_item_ids):
+    """
+    Bring a playlist in line with the desired item ids by applying only the delta,
+    so the playlist keeps its id and untouched entries keep their play state.
+    Returns the number of added and removed entries.
+    """
+    current_entries, _ = emby.get_list_items(playlist_id)
+    item_ids_to_add, entry_ids_to_remove = diff_playlist_items(current_entries, desired_item_ids)
+
+    if entry_ids_to_remove:
+        emby.delete_items_from_playlist(playlist_id, entry_ids_to_remove)
+
+    if item_ids_to_add:
+        emby.add_items_to_playlist(playlist_id, item_ids_to_add)
+
+    return len(item_ids_to_add), len(entry_ids_to_remove)
+
+
 class PlaylistService:
     def __init__(self, source_emby: EmbyClient, target_emby: EmbyClient):
         self.emby = source_emby
@@ -19,8 +64,7 @@ class PlaylistService:
         playlist_items, _ = self.emby.get_list_items(playlist_id)
 
         # Add the items to the new playlist
-        for item in playlist_items:
-            self.target_emby.add_item_to_playlist(new_playlist["Id"], item["Id"])
+        self.target_emby.add_items_to_playlist(new_playlist["Id"], [item["Id"] for item in playlist_items])
 
         return new_playlist
 
@@ -0,0 +1,90 @@
+import asyncio
+
+from src.config import Config
+from src.utils.logger import get_action_logger
+
+logger = get_action_logger("spotdl_engine")
+
+
+class InProcessSpotdlEngine:
+    """
+    Downloads songs through one long-lived Spotdl instance instead of a `python -m spotdl`
+    process per song, so spotdl is imported and authenticated once per run.
+
+    Spotdl sets up a process-wide Spotify client and can only be constructed once,
+    so the instance is shared by every engine in the process.
+    """
+
+    _spotdl = None
+
+    def __init__(self, output_dir, client_id=Config.SPOTIFY_CLIENT_ID, client_secret=Config.SPOTIFY_CLIENT_SECRET,
+                 threads=Config.MUSIC_SPOTDL_CONCURRENCY, batch_size=25):
+        self.output_dir = output_dir
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.threads = threads
+        self.batch_size = batch_size
+
+    def _get_spotdl(self):
+        if InProcessSpotdlEngine._spotdl is None:
+            # Imported here so the subprocess engine works without loading spotdl
+            from spotdl import Spotdl
+
+            InProcessSpotdlEngine._spotdl = Spotdl(
+                client_id=self.client_id,
+                client_secret=self.client_secret,
+                downloader_settings={"output": self.output_dir, "threads": self.threads},
+            )
+        # The downloader settings belong to the shared instance, point it at this engine's folder
+        InProcessSpotdlEngine._spotdl.downloader.settings["output"] = self.output_dir
+        return InProcessSpotdlEngine._spotdl
+
+    def download_batch(self, queries):
+        """
+        Search and download a batch of queries. Returns {query: True/False} for every query.
+        Queries are searched one by one so a query without results doesn't fail the whole batch.
+        """
+        spotdl = self._get_spotdl()
+        outcomes = {query: False for query in queries}
+
+        songs = []
+        song_queries = []
+        for query in queries:
+            try:
+                found = spotdl.search([query])
+            except Exception as e:
+                logger.error(f"spotdl search failed for '{query}': {str(e)}")
+                continue
+            if found:
+                songs.append(found[0])
+                song_queries.append(query)
+            else:
+                logger.warning(f"spotdl found no results for '{query}'")
+
+        if songs:
+            for query, (_, path) in zip(song_queries, spotdl.download_songs(songs)):
+                outcomes[query] = path is not None
+                if path is None:
+                    logger.error(f"spotdl could not download '{query}'")
+
+        return outcomes
+
+    async def download(self, queries, on_batch_done=None):
+        """
+        Download queries in batches on a worker thread, since Spotdl drives its own event loop.
+        on_batch_done(outcomes) is called after each batch. Returns the outcomes of all queries.
+        """
+        queries = list(queries)
+        outcomes = {}
+        for start in range(0, len(queries), self.batch_size):
+            batch = queries[start:start + self.batch_size]
+            try:
+                batch_outcomes = await asyncio.to_thread(self.download_batch, batch)
+            except Exception as e:
+                logger.error(f"spotdl batch failed: {str(e)}")
+                batch_outcomes = {query: False for query in batch}
+
+            outcomes.update(batch_outcomes)
+            if on_batch_done:
+                on_batch_done(batch_outcomes)
+        return outcomes
@@ -0,0 +1,108 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from mutagen import File
+
+from src.clients.db_client import get_database
+from src.config import Config
+from src.utils.logger import get_action_logger
+
+logger = get_action_logger("tag_cache")
+
+AudioTags = namedtuple('AudioTags', ['title', 'artist', 'album', 'track_number', 'duration',
+                                     'musicbrainz_trackid', 'isrc'])
+
+
+def read_tags(file_path):
+    """
+    Read the tags of an audio file with mutagen. Returns AudioTags, or None if the file isn't a
+    readable audio file.
+    """
+    audio = File(file_path, easy=True)
+    if audio is None:
+        return None
+
+    def first(key):
+        values = audio.get(key) or [None]
+        return values[0]
+
+    duration = getattr(audio.info, 'length', None) if audio.info else None
+    return AudioTags(first('title'), first('artist'), first('album'), first('tracknumber'), duration,
+                     first('musicbrainz_trackid'), first('isrc'))
+
+
+class TagCache:
+    """
+    Persistent cache of audio file tags keyed by path, size and mtime, so scanning an unchanged
+    library (often over a network share) only stats the files instead of reopening them.
+    An entry is refreshed as soon as the file's size or mtime changes, e.g. after its tags are rewritten.
+    """
+
+    def __init__(self, db_path=Config.DATABASE_FILE_PATH):
+        self.db = get_database(db_path)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path):
+        """
+        Return the AudioTags of a file, or None if it can't be read as audio.
+        Raises OSError if the file can't be stat'ed.
+        """
+        stat = os.stat(file_path)
+        row = self.db.fetch_one('''SELECT readable, title, artist, album, track_number, duration, musicbrainz_trackid,
+                                          isrc
+                                   FROM audio_tags WHERE path = ? AND size = ? AND mtime_ns = ?''',
+                                (file_path, stat.st_size, stat.st_mtime_ns))
+        if row is not None:
+            self.hits += 1
+            return AudioTags(*row[1:]) if row[0] else None
+
+        self.misses += 1
+        try:
+            tags = read_tags(file_path)
+        except Exception as e:
+            # Not cached, the error may be transient (e.g. the share dropped)
+            logger.error(f"Error reading metadata for {file_path}: {str(e)}")
+            return None
+
+        self.db.execute_query('INSERT OR REPLACE INTO audio_tags VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                              (file_path, stat.st_size, stat.st_mtime_ns, tags is not None,
+                               *(tags or AudioTags(*[None] * len(AudioTags._fields)))))
+        return tags
+
+    def invalidate(self, path):
+        """
+        Drop the entry of a file, or of every file under a directory, once it has been moved or deleted.
+        """
+        prefix = os.path.join(path, '')
+        # Range over the primary key instead of LIKE, which would need the path's wildcards escaped
+        self.db.execute_query('DELETE FROM audio_tags WHERE path = ? OR (path >= ? AND path < ?)',
+                              (path, prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+
+
+def get_tags(file_path, db_path=Config.DATABASE_FILE_PATH):
+    """
+    Return the cached AudioTags of a file, see TagCache.get.
+    """
+    return TagCache(db_path).get(file_path)
+
+
+def forget_tags(path, db_path=Config.DATABASE_FILE_PATH):
+    """
+    Remove the cached tags of a moved or deleted file or directory, see TagCache.invalidate.
+    """
+    TagCache(db_path).invalidate(path)
+
+
+def prefetch_metadata(file_paths, reader, max_workers=Config.MUSIC_TAG_READ_WORKERS):
+    """
+    Call reader on every file on a thread pool, so the reads wait on the file system in parallel.
+    Returns {file_path: result} in the order of file_paths.
+    """
+    file_paths = list(file_paths)
+    if len(file_paths) <= 1:
+        return {file_path: reader(file_path) for file_path in file_paths}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+        return dict(zip(file_paths, executor.map(reader, file_paths)))
@@ -0,0 +1,5 @@
+import os
+
+# Run the tests against the example settings rather than a local config/settings.yml
+os.environ.setdefault('SETTINGS_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                   '..', '..', 'config', 'settings.example.yml'))
@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, call, patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.clients.async_emby_client import AsyncEmbyClient, EmbyRequestError
+
+LIBRARY = [{"Id": str(i), "Name": f"Item {i}"} for i in range(450)]
+
+
+class FakeEmbyServer:
+    """
+    Minimal Emby API: authentication, paged user items, track search and playlist additions.
+    """
+
+    def __init__(self):
+        self.page_requests = []
+        self.playlist_chunks = []
+        self.search_failures = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = 0
+
+        self.app = web.Application()
+        self.app.router.add_post('/Users/AuthenticateByName', self.authenticate)
+        self.app.router.add_get('/emby/Users/{user_id}/Items', self.user_items)
+        self.app.router.add_get('/emby/Items', self.search)
+        self.app.router.add_post('/emby/Playlists/{playlist_id}/Items', self.add_to_playlist)
+
+    async def _track(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+    async def authenticate(self, request):
+        return web.json_response({"User": {"Id": "user-1"}, "AccessToken": "token"})
+
+    async def user_items(self, request):
+        start, limit = int(request.query['StartIndex']), int(request.query['Limit'])
+        self.page_requests.append((start, limit))
+        return web.json_response({"Items": LIBRARY[start:start + limit]})
+
+    async def search(self, request):
+        await self._track()
+        term = request.query['SearchTerm']
+        if self.search_failures.get(term, 0):
+            self.search_failures[term] -= 1
+            raise web.HTTPInternalServerError()
+        return web.json_response({"Items": [{"Id": term, "Name": term}]})
+
+    async def add_to_playlist(self, request):
+        await self._track()
+        self.playlist_chunks.append(request.query['Ids'].split(','))
+        return web.json_response({"ItemAddedCount": len(self.playlist_chunks[-1])})
+
+
+class TestAsyncEmbyClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.emby = FakeEmbyServer()
+        self.server = TestServer(self.emby.app)
+        await self.server.start_server()
+        self.client = await AsyncEmbyClient.create(str(self.server.make_url('')).rstrip('/'), 'user', 'pw',
+                                                   max_concurrency=3)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_iter_items_pages(self):
+        items = [item async for item in self.client.iter_items(page_size=200)]
+        self.assertEqual(items, LIBRARY)
+        self.assertEqual(self.emby.page_requests, [(0, 200), (200, 200), (400, 200)])
+
+    async def test_search_retries_then_succeeds(self):
+        self.emby.search_failures['Song'] = 2
+        with patch('src.clients.async_emby_client.asyncio.sleep', new=AsyncMock()) as sleep:
+            results = await self.client.search_for_track('Song', 'Artist')
+        self.assertEqual(results, [{"Id": "Song", "Name": "Song"}])
+        self.assertEqual([args for args in sleep.await_args_list if args == call(1)], [call(1), call(1)])
+
+    async def test_request_error_after_retries(self):
+        self.emby.search_failures['Song'] = 6
+        with patch('src.clients.async_emby_client.asyncio.sleep', new=AsyncMock()):
+            with self.assertRaises(EmbyRequestError):
+                await self.client._get_request('Items', {'SearchTerm': 'Song'})
+
+    async def test_failed_search_does_not_abort_others(self):
+        self.emby.search_failures['Broken'] = 6
+        with patch('src.clients.async_emby_client.asyncio.sleep', new=AsyncMock()):
+            results = await self.client.search_for_tracks([('Broken', 'A'), ('Song', 'B')])
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1], [{"Id": "Song", "Name": "Song"}])
+
+    async def test_semaphore_bounds_requests_in_flight(self):
+        self.emby.delay = 0.05
+        results = await self.client.search_for_tracks([(f'Song {i}', 'Artist') for i in range(10)])
+        self.assertEqual(len(results), 10)
+        self.assertEqual(self.emby.max_in_flight, 3)
+
+    async def test_playlist_chunks_sent_in_order(self):
+        self.emby.delay = 0.01
+        item_ids = [str(i) for i in range(250)]
+        await self.client.add_items_to_playlist('playlist-1', item_ids, chunk_size=100)
+        self.assertEqual(self.emby.playlist_chunks, [item_ids[:100], item_ids[100:200], item_ids[200:]])
+        self.assertEqual(self.emby.max_in_flight, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from src.services.catalog_cache import CatalogCache
+
+SHOWS = [
+    {"id": 1, "title": "Law & Order", "alternateTitles": [{"title": "Law and Order"}], "path": "/raid/tv/Law & Order"},
+    {"id": 2, "title": "Doctor Who", "alternateTitles": [], "path": "/raid/tv/Doctor Who"},
+]
+
+
+def show_titles(show):
+    return [show["title"]] + [alt["title"] for alt in show["alternateTitles"]]
+
+
+class TestCatalogCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "test.db")
+        self.fetch = MagicMock(return_value=SHOWS)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _cache(self, ttl=timedelta(hours=1)):
+        return CatalogCache("sonarr test", self.fetch, show_titles, ttl=ttl, db_path=self.db_path)
+
+    def test_fetched_once(self):
+        cache = self._cache()
+        self.assertEqual(cache.get(), SHOWS)
+        self.assertEqual(cache.get(), SHOWS)
+        self.assertEqual(self._cache().get(), SHOWS)
+        self.fetch.assert_called_once()
+
+    def test_expired_catalog_is_refetched(self):
+        self._cache(ttl=timedelta(0)).get()
+        self._cache(ttl=timedelta(0)).get()
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_invalidate(self):
+        cache = self._cache()
+        cache.get()
+        cache.invalidate()
+        self._cache().get()
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_lookups(self):
+        cache = self._cache()
+        self.assertEqual(cache.lookup("id", 2)["title"], "Doctor Who")
+        self.assertIsNone(cache.lookup("id", 3))
+        self.assertEqual(cache.lookup_title("LAW AND ORDER")["id"], 1)
+        self.assertEqual(sorted(cache.by_title()), ["doctor who", "law & order", "law and order"])
+
+
+if __name__ == '__main__':
+    unittest.main()
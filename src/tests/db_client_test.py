@@ -0,0 +1,50 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from src.clients.db_client import MIGRATIONS, DatabaseClient, get_database
+
+
+class TestDatabaseClient(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "test.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_wal_mode(self):
+        db = DatabaseClient(self.db_path)
+        self.assertEqual(db.fetch_one("PRAGMA journal_mode")[0], "wal")
+
+    def test_connection_reused_per_thread(self):
+        db = DatabaseClient(self.db_path)
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(db._get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIs(db._get_connection(), db._get_connection())
+        self.assertIsNot(db._get_connection(), connections[0])
+
+    def test_migrations(self):
+        db = get_database(self.db_path)
+        self.assertIs(get_database(self.db_path), db)
+        self.assertEqual(db.fetch_one("PRAGMA user_version")[0], len(MIGRATIONS))
+        tables = {row[0] for row in db.fetch_all("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue({"download_queue", "spotify_emby_matches", "lyrics_tracking"} <= tables)
+        db.migrate()
+        self.assertEqual(db.fetch_one("PRAGMA user_version")[0], len(MIGRATIONS))
+
+    def test_executemany_and_rollback(self):
+        db = DatabaseClient(self.db_path)
+        db.create_table("songs", "title TEXT PRIMARY KEY")
+        db.executemany("INSERT INTO songs VALUES (?)", [("a",), ("b",)])
+        with self.assertRaises(Exception):
+            db.executemany("INSERT INTO songs VALUES (?)", [("c",), ("a",)])
+        self.assertEqual(db.fetch_all("SELECT title FROM songs ORDER BY title"), [("a",), ("b",)])
+
+
+if __name__ == '__main__':
+    unittest.main()
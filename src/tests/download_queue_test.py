@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import timedelta
+
+from src.services.download_queue import DownloadQueue
+
+
+class TestDownloadQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "test.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_enqueue_deduplicates_and_keeps_higher_priority(self):
+        queue = DownloadQueue(self.db_path)
+        queue.enqueue([("Pop", "Song", "Artist", None), ("Charts", "Song", "Artist", None)])
+        queue.enqueue([("Favorites", "Song", "Artist", None)], priority=1)
+        queue.enqueue([("Pop", "Song", "Artist", None)], priority=0)
+
+        rows = queue.db.fetch_all("SELECT album_name, priority FROM download_queue")
+        self.assertEqual(rows, [("", 1)])
+        queue.close()
+
+    def test_claim_by_priority_and_marks_in_progress(self):
+        queue = DownloadQueue(self.db_path)
+        queue.enqueue([("Pop", "Low", "Artist", "Album")])
+        queue.enqueue([("Favorites", "High", "Artist", "Album")], priority=1)
+
+        self.assertEqual(queue.claim(1), [("High", "Artist", "Album")])
+        self.assertEqual(queue.claim(5), [("Low", "Artist", "Album")])
+        self.assertEqual(queue.claim(5), [])
+        self.assertEqual(queue.counts(), {"in_progress": 2})
+
+        self.assertEqual(queue.requeue_stale(), 2)
+        queue.close()
+
+    def test_failed_jobs_back_off_then_give_up(self):
+        queue = DownloadQueue(self.db_path, max_attempts=2, retry_delay=timedelta(0))
+        queue.enqueue([("Pop", "Song", "Artist", "Album")])
+        song = queue.claim(1)[0]
+
+        queue.mark_failed(song, "not found")
+        self.assertEqual(queue.claim(1), [song])
+        queue.mark_failed(song, "not found")
+        self.assertEqual(queue.claim(1), [])
+        self.assertEqual(queue.counts(), {"failed": 1})
+        queue.close()
+
+    def test_backoff_delays_retry(self):
+        queue = DownloadQueue(self.db_path)
+        queue.enqueue([("Pop", "Song", "Artist", "Album")])
+        song = queue.claim(1)[0]
+        queue.mark_failed(song)
+
+        self.assertEqual(queue.claim(1), [])
+        self.assertEqual(queue.counts(), {"pending": 1})
+        queue.close()
+
+    def test_migrates_legacy_tables(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE unmatched_songs (playlist_name TEXT, track_name TEXT, artist_name TEXT, album_name TEXT)")
+        conn.execute("CREATE TABLE downloaded_songs (track_name TEXT, artist_name TEXT, album_name TEXT)")
+        conn.executemany("INSERT INTO unmatched_songs VALUES (?, ?, ?, ?)",
+                         [("Pop", "A", "Artist", "Album"), ("Pop", "A", "Artist", "Album"), ("Pop", "B", "Artist", None)])
+        conn.execute("INSERT INTO downloaded_songs VALUES ('A', 'Artist', 'Album')")
+        conn.commit()
+        conn.close()
+
+        queue = DownloadQueue(self.db_path)
+
+        self.assertEqual(queue.counts(), {"done": 1, "pending": 1})
+        tables = {row[0] for row in queue.db.fetch_all("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertNotIn("unmatched_songs", tables)
+        queue.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
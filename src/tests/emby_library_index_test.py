@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.services.emby_library_index import EmbyLibraryIndex, normalize_title, normalize_artist
+
+
+class TestEmbyLibraryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [
+            {"Id": "1", "Name": "Blinding Lights", "Artists": ["The Weeknd"]},
+            {"Id": "2", "Name": "Save Your Tears (Remix)", "Artists": ["The Weeknd", "Ariana Grande"]},
+            {"Id": "3", "Name": "Levitating (feat. DaBaby)", "Artists": ["Dua Lipa"],
+             "ProviderIds": {"ISRC": "GB-AHT-20-00029", "MusicBrainzTrack": "8F7C1A2B-0000-4000-8000-000000000003"}},
+        ]
+        self.index = EmbyLibraryIndex(self.items)
+
+    def test_normalize_title(self):
+        self.assertEqual(normalize_title("Levitating (feat. DaBaby)"), "levitating")
+        self.assertEqual(normalize_title("Don't Start Now - Live"), "dont start now")
+        self.assertEqual(normalize_title(None), "")
+
+    def test_normalize_artist(self):
+        self.assertEqual(normalize_artist("AC/DC"), "acdc")
+        self.assertEqual(normalize_artist("  The   Weeknd "), "the weeknd")
+
+    def test_find_candidates_by_title_first(self):
+        candidates = self.index.find_candidates("Levitating", "Someone Else")
+        self.assertEqual([item["Id"] for item in candidates], ["3"])
+
+    def test_find_candidates_by_artist(self):
+        candidates = self.index.find_candidates("Save Your Tears", "the weeknd")
+        self.assertEqual([item["Id"] for item in candidates], ["2", "1"])
+
+    def test_find_candidates_no_match(self):
+        self.assertEqual(self.index.find_candidates("Unknown", "Nobody"), [])
+
+    def test_find_by_ids(self):
+        self.assertEqual(self.index.find_by_ids(isrc="GBAHT2000029")["Id"], "3")
+        self.assertEqual(self.index.find_by_ids(musicbrainz_id="8f7c1a2b-0000-4000-8000-000000000003")["Id"], "3")
+        self.assertIsNone(self.index.find_by_ids(isrc="USUM71900001"))
+        self.assertIsNone(self.index.find_by_ids())
+
+    def test_build_streams_library(self):
+        emby = MagicMock()
+        emby.iter_items.return_value = iter(self.items + [self.items[0]])
+        index = EmbyLibraryIndex.build(emby, page_size=2)
+
+        self.assertEqual(len(index), 3)
+        self.assertIn("3", index)
+        self.assertEqual(emby.iter_items.call_args.kwargs['include_item_types'], 'Audio')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import logging
+import os
+import tempfile
+import unittest
+
+from src.utils.file_utils import DirectoryWalker, FileUtils
+
+logger = logging.getLogger("file_utils_test")
+
+
+class TestDirectoryWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.top = self.tmp_dir.name
+        for path in ["a/b", "a/c", "d"]:
+            os.makedirs(os.path.join(self.top, path))
+        for path in ["a/b/song.mp3", "a/cover.jpg", "d/song.flac"]:
+            open(os.path.join(self.top, path), "w").close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.top).replace(os.sep, "/")
+
+    def test_matches_os_walk(self):
+        walked = {self._relative(root): (sorted(dirs), sorted(files)) for root, dirs, files in os.walk(self.top)}
+        walker = DirectoryWalker(self.top)
+        scanned = {self._relative(root): (sorted(entry.name for entry in dirs), sorted(entry.name for entry in files))
+                   for root, dirs, files in walker}
+        self.assertEqual(scanned, walked)
+        self.assertEqual((walker.visited, walker.discovered), (5, 5))
+
+    def test_bottom_up_yields_children_first(self):
+        order = [self._relative(root) for root, _, _ in DirectoryWalker(self.top, topdown=False)]
+        self.assertLess(order.index("a/b"), order.index("a"))
+        self.assertEqual(order[-1], ".")
+
+    def test_tracks_emptiness(self):
+        walker = DirectoryWalker(self.top, topdown=False)
+        empty = []
+        for root, _, files in walker:
+            for entry in files:
+                if entry.name.endswith(".mp3"):
+                    os.remove(entry.path)
+                    walker.removed(entry.path)
+            if walker.is_empty(root):
+                empty.append(self._relative(root))
+        self.assertEqual(sorted(empty), ["a/b", "a/c"])
+
+    def test_remove_empty_dirs(self):
+        os.remove(os.path.join(self.top, "a/b/song.mp3"))
+        os.remove(os.path.join(self.top, "a/cover.jpg"))
+        FileUtils.remove_empty_dirs(logger, self.top)
+        self.assertEqual(sorted(os.listdir(self.top)), ["d"])
+
+    def test_remove_empty_dirs_dry_run(self):
+        FileUtils.remove_empty_dirs(logger, os.path.join(self.top, "a/c"), dry_run=True, include_top=True)
+        self.assertTrue(os.path.isdir(os.path.join(self.top, "a/c")))
+
+
+if __name__ == '__main__':
+    unittest.main()
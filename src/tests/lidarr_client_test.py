@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.clients.lidarr_client import LidarrClient
+from src.services.catalog_cache import CatalogCache
+
+ARTIST = {"id": 7, "artistName": "Massive Attack", "foreignArtistId": "mbid-1"}
+
+
+class TestLidarrExistingArtist(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fetch = MagicMock(return_value=[])
+        self.lidarr = LidarrClient(url="http://lidarr", api_key="key")
+        self.lidarr.catalog = CatalogCache("lidarr test", self.fetch, lambda artist: [artist['artistName']],
+                                           db_path=os.path.join(self.tmp_dir.name, "test.db"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_stale_miss_is_checked_against_fresh_catalog(self):
+        self.lidarr.catalog.get()
+        self.fetch.return_value = [ARTIST]
+        self.assertEqual(self.lidarr.get_existing_artist("mbid-1"), ARTIST)
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_missing_artist(self):
+        self.assertIsNone(self.lidarr.get_existing_artist("mbid-2"))
+
+    @patch("src.clients.lidarr_client.requests.post")
+    @patch("src.clients.lidarr_client.requests.get")
+    def test_get_artist_does_not_add_artist_added_since_cached(self, get, post):
+        self.lidarr.catalog.get()
+        self.fetch.return_value = [ARTIST]
+        get.return_value.json.return_value = [ARTIST]
+        self.assertEqual(self.lidarr.get_artist("Massive Attack", add_if_not_matched=True), ARTIST)
+        post.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
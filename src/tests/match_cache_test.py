@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+from src.services.emby_library_index import EmbyLibraryIndex
+from src.services.match_cache import MatchCache
+
+
+class TestMatchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = MatchCache(os.path.join(self.tmp_dir.name, "test.db"))
+        self.index = EmbyLibraryIndex([{"Id": "emby-1", "Name": "Blinding Lights", "Artists": ["The Weeknd"]}])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hit_after_set(self):
+        self.cache.set("spotify-1", "emby-1", 200)
+        self.assertEqual(self.cache.get("spotify-1", self.index), "emby-1")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 0))
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get("spotify-2", self.index))
+        self.assertIsNone(self.cache.get(None, self.index))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_missing_emby_item_invalidates(self):
+        self.cache.set("spotify-1", "emby-gone", 190)
+        self.assertIsNone(self.cache.get("spotify-1", self.index))
+        self.assertIsNone(self.cache.get("spotify-1"))
+
+    def test_persists_across_instances(self):
+        self.cache.set("spotify-1", "emby-1", 200)
+        cache = MatchCache(os.path.join(self.tmp_dir.name, "test.db"))
+        self.assertEqual(cache.get("spotify-1", self.index), "emby-1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.actions.move_org_tv_to_destination import (build_title_index, fuzzy_match, get_episode_keys, move_folders,
+                                                    move_organized_tv)
+from src.utils.string_utils import StringUtils
+
+
+class TestMoveFolders(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "source")
+        self.destination = os.path.join(self.tmp_dir.name, "destination")
+        os.makedirs(os.path.join(self.source, "Season 01"))
+        os.makedirs(os.path.join(self.destination, "Season 01"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _touch(self, *path):
+        open(os.path.join(*path), "w").close()
+
+    def test_get_episode_keys(self):
+        self._touch(self.destination, "Season 01", "Show - s01e01.mkv")
+        self._touch(self.destination, "Season 01", "Show - S01E02-E03.mkv")
+        self._touch(self.destination, "Season 01", "cover.jpg")
+        self.assertEqual(get_episode_keys(os.path.join(self.destination, "Season 01")), {"S01E01", "S01E02"})
+
+    def test_skips_existing_and_already_moved_episodes(self):
+        self._touch(self.destination, "Season 01", "Show - S01E01.mkv")
+        for name in ["show.s01e01.mkv", "Show S01E02.mkv", "Show S01E02 (copy).mkv"]:
+            self._touch(self.source, "Season 01", name)
+
+        move_folders(self.source, self.destination)
+
+        moved = sorted(os.listdir(os.path.join(self.destination, "Season 01")))
+        # One of the two S01E02 copies is moved, whichever was listed first
+        self.assertEqual(len(moved), 2)
+        self.assertEqual(moved[0], "Show - S01E01.mkv")
+        self.assertIn("S01E02", moved[1])
+        self.assertEqual(os.listdir(self.source), [])
+
+
+class TestFuzzyMatch(unittest.TestCase):
+
+    def setUp(self):
+        self.all_titles = {
+            "law & order": {"id": 1, "title": "Law & Order", "year": 1990},
+            "doctor who": {"id": 2, "title": "Doctor Who", "year": 2005},
+            "doctor who (1963)": {"id": 3, "title": "Doctor Who (1963)", "year": 1963},
+            "marvel's agents of s.h.i.e.l.d.": {"id": 4, "title": "Marvel's Agents of S.H.I.E.L.D.", "year": 2013},
+            "battlestar galactica (2003)": {"id": 5, "title": "Battlestar Galactica (2003)", "year": 2003},
+            "battlestar galactica": {"id": 6, "title": "Battlestar Galactica", "year": 1978},
+        }
+        self.title_index = build_title_index(self.all_titles)
+
+    def test_normalize_show_name(self):
+        self.assertEqual(StringUtils.normalize_show_name("Law & Order (1990)"), "law and order")
+        self.assertEqual(StringUtils.normalize_show_name("Law and  Order 1990"), "law and order")
+
+    def test_and_ampersand_match(self):
+        self.assertEqual(fuzzy_match("Law and Order", self.all_titles, self.title_index)["id"], 1)
+
+    def test_year_picks_show(self):
+        self.assertEqual(fuzzy_match("Doctor Who (2005)", self.all_titles, self.title_index)["id"], 2)
+        self.assertEqual(fuzzy_match("Doctor Who 1963", self.all_titles, self.title_index)["id"], 3)
+
+    def test_remake_without_year_picks_original(self):
+        self.assertEqual(fuzzy_match("Battlestar Galactica", self.all_titles, self.title_index)["id"], 6)
+        self.assertEqual(fuzzy_match("Battlestar Galactica (2003)", self.all_titles, self.title_index)["id"], 5)
+        self.assertEqual(fuzzy_match("Battlestar Galactica 1978", self.all_titles, self.title_index)["id"], 6)
+
+    def test_punctuation_ignored(self):
+        self.assertEqual(fuzzy_match("Marvels Agents of SHIELD", self.all_titles)["id"], 4)
+
+    def test_no_match(self):
+        self.assertIsNone(fuzzy_match("Breaking Bad", self.all_titles, self.title_index))
+
+
+class TestMoveOrganizedTv(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "source")
+        self.show_path = os.path.join(self.tmp_dir.name, "tv", "Doctor Who")
+        os.makedirs(os.path.join(self.source, "Doctor Who", "Season 01"))
+        open(os.path.join(self.source, "Doctor Who", "Season 01", "Doctor Who S01E01.mkv"), "w").close()
+        self.sonarr = MagicMock()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_show_path_from_catalog(self):
+        self.sonarr.get_all_shows.return_value = {
+            "doctor who": {"id": 2, "title": "Doctor Who", "year": 2005, "path": self.show_path}}
+        move_organized_tv(self.sonarr, self.source)
+        self.sonarr.get_show_path.assert_not_called()
+        self.assertTrue(os.path.exists(os.path.join(self.show_path, "Season 01", "Doctor Who S01E01.mkv")))
+        self.sonarr.rescan_series.assert_called_once_with(2)
+
+    def test_show_path_fallback(self):
+        self.sonarr.get_all_shows.return_value = {"doctor who": {"id": 2, "title": "Doctor Who", "year": 2005}}
+        self.sonarr.get_show_path.return_value = self.show_path
+        move_organized_tv(self.sonarr, self.source, dry_run=True)
+        self.sonarr.get_show_path.assert_called_once_with(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.services.playlist_service import diff_playlist_items, sync_playlist_items
+
+
+class TestPlaylistDiff(unittest.TestCase):
+
+    def test_diff_adds_and_removes(self):
+        current = [
+            {"Id": "a", "PlaylistItemId": "1"},
+            {"Id": "b", "PlaylistItemId": "2"},
+        ]
+        to_add, to_remove = diff_playlist_items(current, ["a", "c"])
+        self.assertEqual(to_add, ["c"])
+        self.assertEqual(to_remove, ["2"])
+
+    def test_diff_removes_duplicate_entries(self):
+        current = [
+            {"Id": "a", "PlaylistItemId": "1"},
+            {"Id": "a", "PlaylistItemId": "2"},
+        ]
+        to_add, to_remove = diff_playlist_items(current, ["a"])
+        self.assertEqual(to_add, [])
+        self.assertEqual(to_remove, ["2"])
+
+    def test_diff_deduplicates_desired_items(self):
+        to_add, to_remove = diff_playlist_items([], ["a", "b", "a"])
+        self.assertEqual(to_add, ["a", "b"])
+        self.assertEqual(to_remove, [])
+
+    def test_sync_unchanged_playlist_makes_no_writes(self):
+        emby = MagicMock()
+        emby.get_list_items.return_value = ([{"Id": "a", "PlaylistItemId": "1"}], 1)
+
+        added, removed = sync_playlist_items(emby, "playlist", ["a"])
+
+        self.assertEqual((added, removed), (0, 0))
+        emby.add_items_to_playlist.assert_not_called()
+        emby.delete_items_from_playlist.assert_not_called()
+
+    def test_sync_applies_delta_in_bulk(self):
+        emby = MagicMock()
+        emby.get_list_items.return_value = ([{"Id": "a", "PlaylistItemId": "1"},
+                                             {"Id": "b", "PlaylistItemId": "2"}], 2)
+
+        added, removed = sync_playlist_items(emby, "playlist", ["a", "c", "d"])
+
+        self.assertEqual((added, removed), (2, 1))
+        emby.add_items_to_playlist.assert_called_once_with("playlist", ["c", "d"])
+        emby.delete_items_from_playlist.assert_called_once_with("playlist", ["2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from src.actions.sort_downloaded_albums import organize_music
+
+
+class TestOrganizeMusic(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.destination = os.path.join(self.tmp_dir.name, "organized")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_missing_source_is_skipped(self):
+        source = os.path.join(self.tmp_dir.name, "missing")
+        with self.assertLogs("sort_downloaded_albums", level="WARNING") as logs:
+            asyncio.run(organize_music(source, self.destination, dry_run=False))
+        self.assertIn("No folders found in source directory", logs.output[-1])
+        self.assertFalse(os.path.exists(self.destination))
+
+    def test_empty_source_is_skipped(self):
+        with self.assertLogs("sort_downloaded_albums", level="WARNING") as logs:
+            asyncio.run(organize_music(self.tmp_dir.name, self.destination, dry_run=False))
+        self.assertEqual(len(logs.output), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
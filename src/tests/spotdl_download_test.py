@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.actions import find_unmatched_songs_with_spotdl as spotdl_action
+from src.services.spotdl_engine import InProcessSpotdlEngine
+
+
+class TestSpotdlWorkerPool(unittest.IsolatedAsyncioTestCase):
+
+    async def test_downloads_with_bounded_concurrency(self):
+        running = 0
+        peak = 0
+
+        async def fake_run_spotdl(query, output_dir, timeout):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return (1, "not found") if "Missing" in query else (0, "ok")
+
+        songs = [(f"Song {i}", "Artist", "Album") for i in range(6)] + [("Missing", "Artist", "Album")]
+        downloaded = []
+
+        with patch.object(spotdl_action, "run_spotdl", fake_run_spotdl):
+            count = await spotdl_action.download_songs(songs, "/tmp", downloaded.append, concurrency=2, timeout=5)
+
+        self.assertEqual(count, 6)
+        self.assertEqual(sorted(downloaded), sorted(songs[:6]))
+        self.assertEqual(peak, 2)
+
+    async def test_timeout_kills_download(self):
+        create_subprocess_exec = asyncio.create_subprocess_exec
+
+        def run_sleep(*args, **kwargs):
+            return create_subprocess_exec("sleep", "5", stdout=asyncio.subprocess.PIPE)
+
+        with patch.object(spotdl_action.asyncio, "create_subprocess_exec", run_sleep):
+            returncode, output = await spotdl_action.run_spotdl("query", "/tmp", timeout=0.1)
+
+        self.assertIsNone(returncode)
+        self.assertIn("Timed out", output)
+
+
+class TestInProcessSpotdlEngine(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.spotdl = MagicMock()
+        self.spotdl.downloader.settings = {}
+        self.spotdl.search.side_effect = lambda queries: [] if queries[0] == "missing" else [f"song:{queries[0]}"]
+        self.spotdl.download_songs.side_effect = lambda songs: [
+            (song, None if song == "song:broken" else f"/music/{song}.mp3") for song in songs]
+        patcher = patch.object(InProcessSpotdlEngine, "_spotdl", self.spotdl)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_batches_collect_per_query_outcomes(self):
+        engine = InProcessSpotdlEngine("/downloads", client_id="id", client_secret="secret", batch_size=2)
+        batches = []
+
+        outcomes = await engine.download(["a", "missing", "broken", "b"], batches.append)
+
+        self.assertEqual(outcomes, {"a": True, "missing": False, "broken": False, "b": True})
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(self.spotdl.download_songs.call_count, 2)
+        self.assertEqual(self.spotdl.downloader.settings["output"], "/downloads")
+
+    async def test_in_process_download_records_songs(self):
+        songs = [("a", "Artist", "Album"), ("a", "Artist", "Album"), ("missing", "Artist", "Album")]
+        downloaded = []
+
+        with patch.object(spotdl_action, "build_query", lambda song: song[0]):
+            count = await spotdl_action.download_songs_in_process(songs, "/downloads", downloaded.append)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(downloaded, songs[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from spotipy import SpotifyException
+
+from src.clients.spotify_client import SpotifyClient, RateLimiter
+
+
+class TestSpotifyFetch(unittest.TestCase):
+
+    def setUp(self):
+        # Skip the OAuth setup, the spotipy client is mocked
+        self.spot = SpotifyClient.__new__(SpotifyClient)
+        self.spot.sp = MagicMock()
+        self.spot.max_workers = 4
+        self.spot.rate_limiter = RateLimiter(1000)
+
+    @patch("src.clients.spotify_client.time.sleep")
+    def test_retries_after_rate_limit(self, sleep):
+        rate_limited = SpotifyException(429, -1, "rate limited", headers={"Retry-After": "3"})
+        func = MagicMock(side_effect=[rate_limited, "ok"])
+
+        self.assertEqual(self.spot._call_with_retry(func, "arg"), "ok")
+        sleep.assert_any_call(3)
+
+    def test_other_errors_are_raised(self):
+        func = MagicMock(side_effect=SpotifyException(404, -1, "not found"))
+        with self.assertRaises(SpotifyException):
+            self.spot._call_with_retry(func)
+
+    def test_offset_pages_reassembled_in_order(self):
+        liked = list(range(120))
+        self.spot.sp.current_user_saved_tracks.side_effect = \
+            lambda limit, offset: {"items": liked[offset:offset + limit], "total": len(liked)}
+
+        self.assertEqual(self.spot.get_liked_songs(), liked)
+        offsets = sorted(call.kwargs["offset"] for call in self.spot.sp.current_user_saved_tracks.call_args_list)
+        self.assertEqual(offsets, [0, 50, 100])
+
+    def test_liked_songs_since_stops_at_watermark(self):
+        liked = [{"added_at": f"2024-01-{day:02d}T00:00:00Z"} for day in range(30, 0, -1)]
+        self.spot.sp.current_user_saved_tracks.side_effect = lambda limit, offset: \
+            {"items": liked[offset:offset + limit], "next": offset + limit < len(liked) or None}
+
+        newer = self.spot.get_liked_songs_since("2024-01-25T00:00:00Z", limit=2)
+
+        self.assertEqual([item["added_at"][8:10] for item in newer], ["30", "29", "28", "27", "26"])
+        self.assertEqual(self.spot.sp.current_user_saved_tracks.call_count, 3)
+
+    def test_playlists_tracks_manifest(self):
+        playlists = {"a": list(range(250)), "b": [1000]}
+        self.spot.sp.playlist_items.side_effect = lambda playlist_id, fields, limit, offset, additional_types: \
+            {"items": playlists[playlist_id][offset:offset + limit], "total": len(playlists[playlist_id])}
+
+        manifest = self.spot.get_playlists_tracks(["a", "b", "a"])
+
+        self.assertEqual(manifest, playlists)
+        self.assertIn("external_ids(isrc)", self.spot.sp.playlist_items.call_args.kwargs["fields"])
+
+    def test_playlists_tracks_share_one_pool(self):
+        playlists = {name: list(range(300)) for name in "abcd"}
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def playlist_items(playlist_id, fields, limit, offset, additional_types):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            return {"items": playlists[playlist_id][offset:offset + limit], "total": 300}
+
+        self.spot.max_workers = 2
+        self.spot.sp.playlist_items.side_effect = playlist_items
+
+        self.assertEqual(self.spot.get_playlists_tracks(list(playlists)), playlists)
+        self.assertEqual(in_flight[1], 2)
+
+    def test_failed_playlist_is_left_out(self):
+        self.spot.sp.playlist_items.side_effect = SpotifyException(404, -1, "not found")
+        self.assertEqual(self.spot.get_playlists_tracks(["a"]), {})
+
+    def test_categories_listed_once(self):
+        self.spot.sp.categories.return_value = {"categories": {"items": [
+            {"id": "pop", "name": "Pop"}, {"id": "mood", "name": "Mood"}]}}
+        self.spot.sp.category_playlists.side_effect = lambda category_id: {"playlists": {"items": [category_id]}}
+
+        playlists = self.spot.get_categories_playlists(["Mood", "Jazz", "pop"])
+
+        self.assertEqual(playlists, ["mood", "pop"])
+        self.spot.sp.categories.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
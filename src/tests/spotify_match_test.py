@@ -0,0 +1,47 @@
+import unittest
+
+from src.clients.spotify_client import SpotifyClient
+
+
+class TestSpotifyBatchMatch(unittest.TestCase):
+
+    def setUp(self):
+        # match_song/match_songs don't touch the API, so skip the OAuth setup
+        self.spot = SpotifyClient.__new__(SpotifyClient)
+        self.spotify_songs = [
+            {"name": "Blinding Lights", "artists": [{"name": "The Weeknd"}]},
+            {"name": "Levitating (feat. DaBaby)", "artists": [{"name": "Dua Lipa"}, {"name": "DaBaby"}]},
+            {"name": "Don't Start Now - Live", "artists": [{"name": "Dua Lipa"}]},
+            {"name": "Save Your Tears", "artists": [{"name": "The Weekend"}]},
+            {"name": "", "artists": [{"name": "Nobody"}]},
+        ]
+        self.emby_songs = [
+            {"Id": "1", "Name": "Blinding Lights", "Artists": ["The Weeknd"]},
+            {"Id": "2", "Name": "Levitating", "Artists": ["Dua Lipa"]},
+            {"Id": "3", "Name": "Dont Start Now", "Artists": ["Dua Lipa"]},
+            {"Id": "4", "Name": "Save Your Tears (Remix)", "Artists": ["Ariana Grande", "The Weeknd"]},
+            {"Id": "5", "Name": "Blinding Light", "Artists": []},
+            {"Id": "6", "Name": "", "Artists": ["Nobody"]},
+        ]
+
+    def test_batch_agrees_with_match_song(self):
+        for spotify_song in self.spotify_songs:
+            expected = [index for index, emby_song in enumerate(self.emby_songs)
+                        if self.spot.match_song(spotify_song, emby_song)]
+            index, score = self.spot.match_songs(spotify_song, self.emby_songs)
+
+            self.assertEqual(index, expected[0] if expected else None, spotify_song["name"])
+            if index is not None:
+                self.assertGreaterEqual(score, 165)
+
+    def test_batch_returns_first_accepted(self):
+        song = {"name": "Blinding Lights", "artists": [{"name": "The Weeknd"}]}
+        index, score = self.spot.match_songs(song, [self.emby_songs[1], self.emby_songs[0], self.emby_songs[0]])
+        self.assertEqual((index, score), (1, 200))
+
+    def test_batch_no_candidates(self):
+        self.assertEqual(self.spot.match_songs(self.spotify_songs[0], []), (None, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
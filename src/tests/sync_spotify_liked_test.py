@@ -0,0 +1,29 @@
+import unittest
+from datetime import datetime
+
+from src.actions.sync_spotify_liked import needs_full_sync
+
+
+class TestLikedSyncState(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime(2024, 6, 10)
+
+    def test_first_sync_is_full(self):
+        self.assertTrue(needs_full_sync(None, "playlist", self.now))
+
+    def test_recent_sync_is_incremental(self):
+        state = ("playlist", "2024-06-09T12:00:00Z", "2024-06-08T00:00:00")
+        self.assertFalse(needs_full_sync(state, "playlist", self.now, full_sync_days=7))
+
+    def test_stale_full_sync_reconciles(self):
+        state = ("playlist", "2024-06-09T12:00:00Z", "2024-06-01T00:00:00")
+        self.assertTrue(needs_full_sync(state, "playlist", self.now, full_sync_days=7))
+
+    def test_recreated_playlist_is_full(self):
+        state = ("old-playlist", "2024-06-09T12:00:00Z", "2024-06-08T00:00:00")
+        self.assertTrue(needs_full_sync(state, "playlist", self.now))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from src.services.tag_cache import AudioTags, TagCache, prefetch_metadata
+
+TAGS = AudioTags('Blinding Lights', 'The Weeknd', 'After Hours', '9/14', 200.0, None, 'USUG11904206')
+
+
+class TestTagCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = TagCache(os.path.join(self.tmp_dir.name, "test.db"))
+        self.file_path = os.path.join(self.tmp_dir.name, "song.mp3")
+        with open(self.file_path, "wb") as f:
+            f.write(b"audio")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @patch('src.services.tag_cache.read_tags', return_value=TAGS)
+    def test_unchanged_file_is_not_reread(self, read_tags):
+        self.assertEqual(self.cache.get(self.file_path), TAGS)
+        self.assertEqual(self.cache.get(self.file_path), TAGS)
+        self.assertEqual(read_tags.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    @patch('src.services.tag_cache.read_tags', return_value=TAGS)
+    def test_changed_file_is_reread(self, read_tags):
+        self.cache.get(self.file_path)
+        with open(self.file_path, "ab") as f:
+            f.write(b"more audio")
+        self.cache.get(self.file_path)
+        self.assertEqual(read_tags.call_count, 2)
+
+    def test_non_audio_file_is_cached(self):
+        file_path = os.path.join(self.tmp_dir.name, "notes.txt")
+        with open(file_path, "w") as f:
+            f.write("not audio")
+        self.assertIsNone(self.cache.get(file_path))
+        self.assertIsNone(self.cache.get(file_path))
+        self.assertEqual(self.cache.hits, 1)
+
+    @patch('src.services.tag_cache.read_tags', side_effect=OSError("share went away"))
+    def test_read_error_is_not_cached(self, read_tags):
+        self.assertIsNone(self.cache.get(self.file_path))
+        self.assertIsNone(self.cache.get(self.file_path))
+        self.assertEqual(read_tags.call_count, 2)
+
+    @patch('src.services.tag_cache.read_tags', return_value=TAGS)
+    def test_invalidate_drops_file_and_directory_entries(self, read_tags):
+        paths = [os.path.join(self.tmp_dir.name, *parts)
+                 for parts in [("album", "01.mp3"), ("album", "cd2", "01.mp3"), ("album 2", "01.mp3")]]
+        for path in paths:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "wb").close()
+            self.cache.get(path)
+        self.cache.get(self.file_path)
+
+        self.cache.invalidate(self.file_path)
+        self.cache.invalidate(os.path.join(self.tmp_dir.name, "album"))
+
+        rows = self.cache.db.fetch_all('SELECT path FROM audio_tags')
+        self.assertEqual([row[0] for row in rows], [paths[2]])
+
+
+class TestPrefetchMetadata(unittest.TestCase):
+
+    def test_results_follow_input_order(self):
+        def reader(file_path):
+            # Later files finish first
+            time.sleep(0.01 * (5 - int(file_path)))
+            return int(file_path) * 2
+
+        metadata = prefetch_metadata([str(i) for i in range(5)], reader, max_workers=5)
+        self.assertEqual(list(metadata.items()), [(str(i), i * 2) for i in range(5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
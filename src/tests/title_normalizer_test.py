@@ -0,0 +1,42 @@
+import unittest
+
+from src.utils import title_normalizer
+from src.utils.string_utils import StringUtils
+from src.actions.find_unmatched_songs_with_spotdl import remove_special_characters
+
+
+class TestTitleNormalizer(unittest.TestCase):
+
+    def test_clean_title_strips_noise(self):
+        self.assertEqual(title_normalizer.clean_title("Levitating (feat. DaBaby)"), "levitating")
+        self.assertEqual(title_normalizer.clean_title("Don't Start Now - Live"), "don't start now")
+        self.assertEqual(title_normalizer.clean_title("Bohemian Rhapsody - 2011 Remaster"), "bohemian rhapsody -")
+        self.assertEqual(title_normalizer.clean_title("Stayin' Alive - 2007 Digital Remaster"), "stayin' alive -")
+        self.assertEqual(title_normalizer.clean_title("Midnight City (Original Mix) (Explicit)"), "midnight city")
+        self.assertEqual(title_normalizer.clean_title("Hello ft. Adele"), "hello")
+
+    def test_clean_title_nested_parentheses(self):
+        self.assertEqual(title_normalizer.clean_title("Song (Live at Wembley (Remastered))"), "song")
+        self.assertEqual(title_normalizer.clean_title("Song (Live (feat. X) Version)"), "song")
+
+    def test_clean_title_is_memoized(self):
+        title_normalizer.clean_title.cache_clear()
+        title_normalizer.clean_title("Blinding Lights (Remix)")
+        title_normalizer.clean_title("Blinding Lights (Remix)")
+        self.assertEqual(title_normalizer.clean_title.cache_info().hits, 1)
+
+    def test_string_utils_delegates(self):
+        self.assertEqual(StringUtils.clean_string("AC/DC"), "acdc")
+        self.assertEqual(StringUtils.remove_special_characters("Song [Live] (Demo)."), "Song Live Demo")
+        self.assertEqual(StringUtils.remove_special_characters(None), "")
+        self.assertEqual(StringUtils.remove_special_characters(1999), "1999")
+
+    def test_spotdl_remove_special_characters(self):
+        self.assertEqual(remove_special_characters("Beyoncé: Halo!"), "Beyonce_ Halo")
+        self.assertEqual(remove_special_characters("!!!"), None)
+        self.assertEqual(remove_special_characters("Sigur Rós", skip_non_ascii=True), None)
+        self.assertEqual(remove_special_characters(None), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
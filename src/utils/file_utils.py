@@ -2,6 +2,93 @@ import os
 import subprocess
 
 
+class DirectoryWalker:
+    """
+    Walk a directory tree with os.scandir, listing each directory once. Yields (path, dirs, files)
+    like os.walk, but dirs and files are os.DirEntry lists whose is_dir()/is_file()/stat() results
+    come from the listing instead of extra stat calls. Symlinked directories are not descended into.
+
+    Progress is available while walking: visited directories, and discovered ones (visited plus the
+    ones found but not listed yet), so nothing needs to walk the tree just to count it.
+
+    Bottom-up, each directory is yielded after its subdirectories, and the walker keeps count of the
+    entries left in it: report deleted files and directories with removed(path), and is_empty(path)
+    tells whether a yielded directory has nothing left without listing it again.
+    """
+
+    def __init__(self, top, topdown=True, logger=None):
+        self.top = os.path.normpath(top)
+        self.topdown = topdown
+        self.logger = logger
+        self.visited = 0
+        self.discovered = 1
+        self._remaining = {}
+
+    def _scan(self, path):
+        dirs = []
+        files = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    (dirs if is_dir else files).append(entry)
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"Error listing {path}: {e}")
+            return None
+
+        if not self.topdown:
+            self._remaining[path] = len(dirs) + len(files)
+        return dirs, files
+
+    def _subdirectories(self, dirs):
+        subdirs = [entry.path for entry in dirs if not entry.is_symlink()]
+        self.discovered += len(subdirs)
+        return subdirs
+
+    def __iter__(self):
+        if self.topdown:
+            stack = [self.top]
+            while stack:
+                path = stack.pop()
+                listing = self._scan(path)
+                if listing is None:
+                    continue
+                self.visited += 1
+                # The caller may prune dirs in place to skip subdirectories, as with os.walk
+                yield path, listing[0], listing[1]
+                stack.extend(reversed(self._subdirectories(listing[0])))
+        else:
+            stack = [(self.top, None)]
+            while stack:
+                path, listing = stack[-1]
+                if listing is None:
+                    listing = self._scan(path)
+                    if listing is None:
+                        stack.pop()
+                        continue
+                    stack[-1] = (path, listing)
+                    stack.extend((subdir, None) for subdir in reversed(self._subdirectories(listing[0])))
+                    continue
+                stack.pop()
+                self.visited += 1
+                yield path, listing[0], listing[1]
+
+    def removed(self, path):
+        """
+        Record that a file or directory found by the walk was deleted or moved away.
+        """
+        parent = os.path.dirname(path)
+        if self._remaining.get(parent):
+            self._remaining[parent] -= 1
+
+    def is_empty(self, path):
+        return self._remaining.get(path) == 0
+
+
 class FileUtils:
     @staticmethod
     def safe_move(logger, src, dst, dry_run=False):
@@ -76,6 +163,28 @@ class FileUtils:
             except OSError:
                 logger.warning(f'Failed to delete directory: {src}')
 
+    @staticmethod
+    def remove_empty_dirs(logger, path, dry_run=False, include_top=False):
+        """
+        Remove the empty directories under path in one bottom-up pass. A directory that only held
+        empty directories is removed too; path itself only if include_top is set.
+        """
+        walker = DirectoryWalker(path, topdown=False, logger=logger)
+        for root, _, _ in walker:
+            if not walker.is_empty(root) or (root == walker.top and not include_top):
+                continue
+
+            if dry_run:
+                logger.info(f"[DRY RUN] Would remove empty directory: '{root}'")
+            else:
+                try:
+                    os.rmdir(root)
+                    logger.info(f"Removed empty directory: '{root}'")
+                except OSError as e:
+                    logger.error(f"Error removing directory '{root}': {e}")
+                    continue
+            walker.removed(root)
+
     @staticmethod
     def get_directories(path):
         """Get a list of all direct children directories in the given path."""
@@ -2,6 +2,8 @@ import re
 
 from fuzzywuzzy import fuzz
 
+from src.utils import title_normalizer
+
 
 class StringUtils:
 
@@ -10,22 +12,12 @@ class StringUtils:
         """
         Helper function to remove non-alphanumeric characters and convert to lowercase.
         """
-        return re.sub(r"[^a-zA-Z0-9\s]", "", s).lower()
+        return title_normalizer.clean_string(s)
 
     @staticmethod
     def remove_special_characters(text):
         # Remove special characters, brackets, parentheses, and their contents
-        if text is None:
-            return ""
-        if not isinstance(text, str):
-            text = str(text)
-
-        cleaned_text = re.sub(r"[\[\]\(\)]*", "", text)
-        cleaned_text = re.sub(r"[^a-zA-Z0-9\s]", "", cleaned_text)
-        # cleaned_text = re.sub(r'[<>:"/\\|?*]', "_", cleaned_text)
-        cleaned_text = cleaned_text.rstrip('. ')
-
-        return cleaned_text.strip()
+        return title_normalizer.remove_special_characters(text)
 
     # def sanitize_filename(filename):
     #     # Replace problematic characters with underscores
@@ -42,6 +34,17 @@ class StringUtils:
         match = re.search(r'\b(19\d{2}|20\d{2})\b', name)
         return int(match.group(1)) if match else None
 
+    @staticmethod
+    def normalize_show_name(name):
+        """
+        Build the comparison key for a TV show name: lowercased, '&' spelled 'and',
+        a release year dropped, punctuation removed and whitespace collapsed.
+        """
+        name = name.lower().replace('&', ' and ')
+        name = re.sub(r'\(?\b(?:19|20)\d{2}\b\)?', ' ', name)
+        name = re.sub(r'[^\w\s]', '', name)
+        return ' '.join(name.split())
+
     @staticmethod
     def is_similar_artist(new_artist, existing_artist, threshold=90):
         # remove 'the' from the beginning of the artist name